@@ -1,3 +1,3 @@
-from .tool import list_tools, load_tool
+from .tool import get_toolmeta, list_tools, load_tool
 
-__all__ = ['list_tools', 'load_tool']
+__all__ = ['list_tools', 'load_tool', 'get_toolmeta']
@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import agentlego
+from agentlego.schema import Parameter, ToolMeta
+from agentlego.types import CatgoryToIO
+from agentlego.utils.file import get_cache_dir
+from agentlego.version import __version__
+
+_IO2CATEGORY = {v: k for k, v in CatgoryToIO.items()}
+
+# Only the built-in tools are persisted, since the manifest file is validated
+# by the source files of the built-in tools.
+_BUILTIN_PREFIX = 'agentlego.tools.'
+
+
+def toolmeta_to_dict(toolmeta: ToolMeta) -> dict:
+    """Convert the tool meta to a JSON-serializable dict."""
+
+    def _param(p: Parameter) -> dict:
+        return dict(
+            type=_IO2CATEGORY[p.type],
+            name=p.name,
+            description=p.description,
+            optional=p.optional,
+            default=p.default,
+            filetype=p.filetype,
+        )
+
+    return dict(
+        name=toolmeta.name,
+        description=toolmeta.description,
+        inputs=[_param(p) for p in toolmeta.inputs],
+        outputs=[_param(p) for p in toolmeta.outputs],
+    )
+
+
+def toolmeta_from_dict(data: dict) -> ToolMeta:
+    """Construct the tool meta from the dict by :func:`toolmeta_to_dict`."""
+
+    def _param(item: dict) -> Parameter:
+        return Parameter(**{**item, 'type': CatgoryToIO[item['type']]})
+
+    return ToolMeta(
+        name=data['name'],
+        description=data['description'],
+        inputs=tuple(_param(item) for item in data['inputs']),
+        outputs=tuple(_param(item) for item in data['outputs']),
+    )
+
+
+def _source_fingerprint() -> str:
+    """The fingerprint of the version and the source files of built-in tools."""
+    tools_dir = Path(agentlego.__file__).parent / 'tools'
+    items = [__version__]
+    for path in sorted(tools_dir.rglob('*.py')):
+        stat = path.stat()
+        items.append(f'{path.relative_to(tools_dir)}:{stat.st_mtime_ns}:{stat.st_size}')
+    return '\n'.join(items)
+
+
+class ToolManifest:
+    """The default tool metas of the registered tools.
+
+    The tool metas are extracted once and kept in memory, so that listing and
+    searching tools don't inspect the tool classes again. The tool metas of the
+    built-in tools are also persisted in the cache directory, and the file is
+    invalid once the version or any source file of built-in tools changes,
+    which avoids importing all tool modules in a new process.
+
+    Args:
+        registry (Mapping): The mapping from tool names to tool classes, which
+            supports ``registry.target(name)`` to get the import path of a tool
+            without importing it.
+        cache_dir (str | None): The directory to persist the manifest. Defaults
+            to None, which means to use :func:`~agentlego.utils.get_cache_dir`.
+        persist (bool): Whether to persist the manifest. Defaults to True.
+    """
+
+    def __init__(self,
+                 registry: Mapping,
+                 cache_dir: Optional[str] = None,
+                 persist: bool = True):
+        self.registry = registry
+        cache_dir = Path(cache_dir).expanduser() if cache_dir else get_cache_dir()
+        self.path = cache_dir / f'toolmeta-{__version__}.json'
+        self.persist = persist
+        # {name: (target, toolmeta)}
+        self._metas: Dict[str, Tuple[str, ToolMeta]] = {}
+        self._persisted: Optional[Dict[str, Any]] = None
+        self._fingerprint: Optional[str] = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def _load_persisted(self) -> Dict[str, Any]:
+        if self._persisted is None:
+            self._persisted = {}
+            if self.persist:
+                self._fingerprint = _source_fingerprint()
+                try:
+                    with open(self.path) as f:
+                        data = json.load(f)
+                    if data.get('fingerprint') == self._fingerprint:
+                        self._persisted = data['tools']
+                except (OSError, ValueError, KeyError):
+                    pass
+        return self._persisted
+
+    def _save_persisted(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = dict(fingerprint=self._fingerprint, tools=self._persisted)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _lookup(self, name: str) -> ToolMeta:
+        target = self.registry.target(name)
+        cached = self._metas.get(name)
+        if cached is not None and cached[0] == target:
+            return cached[1]
+
+        builtin = self.persist and target.startswith(_BUILTIN_PREFIX)
+        persisted = self._load_persisted().get(name) if builtin else None
+        if persisted is not None and persisted['target'] == target:
+            toolmeta = toolmeta_from_dict(persisted['toolmeta'])
+        else:
+            toolmeta = self.registry[name].get_default_toolmeta()
+            if builtin:
+                try:
+                    data = toolmeta_to_dict(toolmeta)
+                    json.dumps(data)
+                except (KeyError, TypeError, ValueError):
+                    # Skip the tool metas which are not JSON-serializable.
+                    pass
+                else:
+                    self._persisted[name] = dict(target=target, toolmeta=data)
+                    self._dirty = True
+
+        self._metas[name] = (target, toolmeta)
+        return toolmeta
+
+    def get(self, name: str) -> ToolMeta:
+        """Get the default tool meta of a registered tool."""
+        with self._lock:
+            toolmeta = self._lookup(name)
+            self._save_persisted()
+        return toolmeta
+
+    def items(self) -> List[Tuple[str, ToolMeta]]:
+        """Get the default tool metas of all registered tools."""
+        with self._lock:
+            items = [(name, self._lookup(name)) for name in self.registry]
+            self._save_persisted()
+        return items
@@ -1,13 +1,126 @@
 import importlib
 import inspect
-from typing import Optional, Union
+import threading
+from collections.abc import MutableMapping
+from importlib.metadata import entry_points
+from typing import Dict, Iterator, Optional, Union
 
-import agentlego.tools
-from agentlego.tools import BaseTool
+from agentlego.schema import ToolMeta
+from agentlego.tools import TOOL_MODULES, BaseTool
 from agentlego.tools.func import _FuncToolType
 from agentlego.utils.cache import load_or_build_object
+from .manifest import ToolManifest
 
-NAMES2TOOLS = {}
+# The entry point group for the third-party packages to register tools.
+ENTRY_POINT_GROUP = 'agentlego.tools'
+
+
+class ToolRegistry(MutableMapping):
+    """The mapping from the tool names to the tool classes, which only imports
+    the module of a tool when the tool is accessed for the first time.
+
+    The third-party packages can register tools by the ``agentlego.tools``
+    entry points, like ``MyTool = "my_package.tools:MyTool"``.
+    """
+
+    def __init__(self):
+        self._tools = {}
+        # {name: 'module:attr'} of the tools which are not imported.
+        self._lazy: Dict[str, str] = {}
+        self._plugins_loaded = False
+        self._lock = threading.RLock()
+        # Increased on every change, so that the indexes of the tools can
+        # be synchronized incrementally.
+        self.version = 0
+
+    def register_lazy(self, name: str, target: str):
+        """Register a tool by ``'module:attr'`` without importing it."""
+        with self._lock:
+            self._tools.pop(name, None)
+            self._lazy[name] = target
+            self.version += 1
+
+    def _load_plugins(self):
+        if self._plugins_loaded:
+            return
+        with self._lock:
+            if self._plugins_loaded:
+                return
+            self._plugins_loaded = True
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                if ep.name in self._tools or ep.name in self._lazy:
+                    continue
+                if ep.attr:
+                    self._lazy[ep.name] = ep.value
+                else:
+                    # An entry point of a module registers all tools in it.
+                    for k, v in extract_all_tools(ep.value).items():
+                        self._tools.setdefault(k, v)
+                self.version += 1
+
+    def target(self, name: str) -> str:
+        """Get the ``'module:attr'`` of a tool without importing it."""
+        if name not in self._tools:
+            self._load_plugins()
+            with self._lock:
+                if name in self._lazy:
+                    return self._lazy[name]
+        tool = self[name]
+        if isinstance(tool, _FuncToolType):
+            tool = tool.func
+        return f'{tool.__module__}:{tool.__qualname__}'
+
+    def __getitem__(self, name: str):
+        if name not in self._tools:
+            self._load_plugins()
+            with self._lock:
+                if name in self._lazy:
+                    module, _, attr = self._lazy[name].partition(':')
+                    self._tools[name] = getattr(importlib.import_module(module), attr)
+                    del self._lazy[name]
+        return self._tools[name]
+
+    def __setitem__(self, name: str, tool):
+        with self._lock:
+            self._lazy.pop(name, None)
+            self._tools[name] = tool
+            self.version += 1
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            if self._lazy.pop(name, None) is None:
+                del self._tools[name]
+            self.version += 1
+
+    def __contains__(self, name) -> bool:
+        if name not in self._tools and name not in self._lazy:
+            self._load_plugins()
+        return name in self._tools or name in self._lazy
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_plugins()
+        with self._lock:
+            names = list(self._tools) + list(self._lazy)
+        return iter(names)
+
+    def __len__(self) -> int:
+        self._load_plugins()
+        return len(self._tools) + len(self._lazy)
+
+    def copy(self) -> 'ToolRegistry':
+        new = ToolRegistry()
+        with self._lock:
+            new._tools = dict(self._tools)
+            new._lazy = dict(self._lazy)
+            new._plugins_loaded = self._plugins_loaded
+            new.version = self.version
+        return new
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)})'
+
+
+NAMES2TOOLS = ToolRegistry()
 
 
 def extract_all_tools(module):
@@ -27,7 +140,23 @@ def register_all_tools(module):
     NAMES2TOOLS.update(extract_all_tools(module))
 
 
-register_all_tools(agentlego.tools)
+for _name, _module in TOOL_MODULES.items():
+    NAMES2TOOLS.register_lazy(_name, f'agentlego.tools{_module}:{_name}')
+
+TOOL_MANIFEST = ToolManifest(NAMES2TOOLS)
+
+
+def get_toolmeta(tool_type: str) -> ToolMeta:
+    """Get the default tool meta of a registered tool from the manifest,
+    without importing the tool if the manifest is persisted.
+
+    Args:
+        tool_type (str): The registered name of the tool.
+
+    Returns:
+        ToolMeta: The default tool meta.
+    """
+    return TOOL_MANIFEST.get(tool_type)
 
 
 def list_tools(with_description=False):
@@ -48,8 +177,8 @@ def list_tools(with_description=False):
         ...     print(name, description)
     """
     if with_description:
-        return list((name, cls.get_default_toolmeta().description)
-                    for name, cls in NAMES2TOOLS.items())
+        return list((name, toolmeta.description)
+                    for name, toolmeta in TOOL_MANIFEST.items())
     else:
         return list(NAMES2TOOLS.keys())
 
@@ -58,6 +187,7 @@ def load_tool(tool_type: str,
               name: Optional[str] = None,
               description: Optional[str] = None,
               device=None,
+              preload: bool = False,
               **kwargs) -> BaseTool:
     """Load a configurable callable tool for different task.
 
@@ -70,6 +200,9 @@ def load_tool(tool_type: str,
         description (str): The description to override the default description.
             Defaults to None.
         device (str): The device to load the tool. Defaults to None.
+        preload (bool): Whether to start loading the models of the tool in a
+            background thread, instead of loading at the first call.
+            Defaults to False.
         **kwargs: key-word arguments to build the specific tools.
             These arguments are related ``tool``. You can find the arguments
             of the specific tool type according to the given tool in the
@@ -102,4 +235,7 @@ def load_tool(tool_type: str,
         # Only enable cache if no overrode attribution
         # to avoid the cached tool is changed.
         tool_obj = load_or_build_object(constructor, **kwargs)
+
+    if preload:
+        tool_obj.preload()
     return tool_obj
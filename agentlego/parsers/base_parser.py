@@ -10,6 +10,9 @@ class BaseParser(metaclass=ABCMeta):
 
     def __init__(self, tool: 'BaseTool') -> None:
         self.tool: 'BaseTool' = tool
+        self._compiled_key = None
+        self._plan = None
+        self._description = None
 
     @property
     def toolmeta(self) -> 'ToolMeta':
@@ -25,3 +28,32 @@ class BaseParser(metaclass=ABCMeta):
 
     def refine_description(self) -> str:
         return self.toolmeta.description
+
+    def compile(self) -> Any:
+        """Precompute the conversions according to the tool meta, which are
+        used by :meth:`parse_inputs` and :meth:`parse_outputs` as
+        :attr:`plan`."""
+        return None
+
+    def _check_compiled(self):
+        # The tool meta is immutable, and the plan and the description are
+        # compiled again if the tool meta is replaced.
+        toolmeta = self.toolmeta
+        if toolmeta is not self._compiled_key:
+            self._plan = self.compile()
+            self._description = None
+            self._compiled_key = toolmeta
+
+    @property
+    def plan(self) -> Any:
+        """The compiled conversions of the tool by :meth:`compile`."""
+        self._check_compiled()
+        return self._plan
+
+    @property
+    def description(self) -> str:
+        """The memoized description by :meth:`refine_description`."""
+        self._check_compiled()
+        if self._description is None:
+            self._description = self.refine_description()
+        return self._description
@@ -26,8 +26,8 @@ class LangChainParser(DefaultParser):
         # gather outputs into a single string
         return ', '.join(str(output) for output in outputs)
 
-    def refine_description(self, description: str) -> str:
-        refined = super().refine_description(description)
+    def refine_description(self) -> str:
+        refined = super().refine_description()
         num_inputs = len(self.toolmeta.inputs)
 
         if num_inputs > 1:
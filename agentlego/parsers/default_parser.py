@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Dict, Tuple
 
 from agentlego.types import AudioIO, File, ImageIO, IOType
 from .base_parser import BaseParser
@@ -11,45 +11,42 @@ class DefaultParser(BaseParser):
         File: 'path',
     }
 
+    def compile(self) -> Tuple[Tuple[str, ...], Dict[str, type], Dict[type, str]]:
+        """Precompute the names of positional arguments, the types of all
+        arguments and the formats of outputs."""
+        names = tuple(p.name for p in self.toolmeta.inputs)
+        types = {p.name: p.type for p in self.toolmeta.inputs}
+        return names, types, dict(self.agent_type2format)
+
     def parse_inputs(self, *args, **kwargs) -> Tuple[tuple, dict]:
-        for arg, p in zip(args, self.tool.inputs):
-            kwargs[p.name] = arg
+        names, types, _ = self.plan
+        for arg, name in zip(args, names):
+            kwargs[name] = arg
 
         parsed_kwargs = {}
         for k, v in kwargs.items():
-            p = self.tool.arguments.get(k)
-            if p is None:
+            p_type = types.get(k)
+            if p_type is None:
                 raise TypeError(f'Got unexcepted keyword argument "{k}".')
-            if not isinstance(v, p.type):
-                tool_input = p.type(v)
-            else:
-                tool_input = v
-            parsed_kwargs[k] = tool_input
+            parsed_kwargs[k] = v if isinstance(v, p_type) else p_type(v)
 
         return (), parsed_kwargs
 
+    def _parse_output(self, out):
+        if isinstance(out, IOType):
+            format = self.plan[2].get(type(out))
+            if format:
+                out = out.to(format)
+        return out
+
     def parse_outputs(self, outputs):
         if isinstance(outputs, tuple):
             assert len(outputs) == len(self.toolmeta.outputs)
-            parsed_outs = []
-            for out in outputs:
-                format = self.agent_type2format.get(type(out))
-                if isinstance(out, IOType) and format:
-                    out = out.to(format)
-                parsed_outs.append(out)
-            parsed_outs = tuple(parsed_outs)
+            parsed_outs = tuple(self._parse_output(out) for out in outputs)
         elif isinstance(outputs, dict):
-            parsed_outs = {}
-            for k, out in outputs.items():
-                format = self.agent_type2format.get(type(out))
-                if isinstance(out, IOType) and format:
-                    out = out.to(format)
-                parsed_outs[k] = out
+            parsed_outs = {k: self._parse_output(out) for k, out in outputs.items()}
         else:
-            format = self.agent_type2format.get(type(outputs))
-            if isinstance(outputs, IOType) and format:
-                outputs = outputs.to(format)
-            parsed_outs = outputs
+            parsed_outs = self._parse_output(outputs)
 
         return parsed_outs
 
@@ -1,12 +1,36 @@
-import copy
+import dataclasses
+import sys
+import warnings
 from dataclasses import dataclass
 from typing import Any, Optional, Tuple, Type
 
+# Use slots to save memory if available (Python 3.10+).
+_SLOTS = dict(slots=True) if sys.version_info >= (3, 10) else {}
 
-@dataclass
-class Parameter:
+
+class _Immutable:
+    """The shared methods of the immutable meta information. Since the meta
+    information cannot be modified, the copies share the same object."""
+    __slots__ = ()
+
+    def replace(self, **changes):
+        """Get a new object with the specified fields replaced."""
+        return dataclasses.replace(self, **changes)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+@dataclass(frozen=True, **_SLOTS)
+class Parameter(_Immutable):
     """Meta information for parameters.
 
+    The parameter is immutable, use :meth:`replace` or :meth:`merge` to get a
+    modified one.
+
     Args:
         type (type): The type of the value.
         name (str): tool name for agent to identify the tool.
@@ -22,17 +46,37 @@ class Parameter:
     default: Optional[Any] = None
     filetype: Optional[str] = None
 
-    def update(self, other: 'Parameter'):
-        other = copy.deepcopy(other)
-        for k, v in copy.deepcopy(other.__dict__).items():
-            if v is not None:
-                self.__dict__[k] = v
+    def merge(self, other: 'Parameter') -> 'Parameter':
+        """Get a new parameter with the fields which are not None in the
+        ``other`` parameter."""
+        changes = {
+            field.name: getattr(other, field.name)
+            for field in dataclasses.fields(other)
+            if getattr(other, field.name) is not None
+        }
+        return self.replace(**changes) if changes else self
+
+    def update(self, other: 'Parameter') -> 'Parameter':
+        """Deprecated alias of :meth:`merge`.
 
+        Since the parameter is immutable, it returns the merged parameter
+        instead of modifying the parameter in place.
+        """
+        warnings.warn(
+            '`Parameter.update` is deprecated, and it returns a new parameter '
+            'instead of modifying in place since the parameter is immutable. '
+            'Please use `Parameter.merge` instead.',
+            DeprecationWarning,
+            stacklevel=2)
+        return self.merge(other)
 
-@dataclass
-class ToolMeta:
+
+@dataclass(frozen=True, **_SLOTS)
+class ToolMeta(_Immutable):
     """Meta information for tool.
 
+    The tool meta is immutable, use :meth:`replace` to get a modified one.
+
     Args:
         name (str): tool name for agent to identify the tool.
         description (str): Description for tool.
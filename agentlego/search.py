@@ -1,18 +1,140 @@
-from typing import List
+import hashlib
+import heapq
+import math
+import os
+import re
+import threading
+import zipfile
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 
-from .apis.tool import list_tools
-from .utils import load_or_build_object
+from .apis.tool import NAMES2TOOLS, get_toolmeta, list_tools
+from .utils import get_cache_dir, load_or_build_object
 
 
-def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
-    """Calculate the cosine similarity of a and b."""
-    dot_product = np.dot(b, a)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b, axis=1)
-    res = dot_product / (norm_a * norm_b)
-    return res
+class EmbeddingIndex:
+    """The embeddings of the tool descriptions by an embedding model.
+
+    The normalized embeddings are persisted as float32 with the hashes of the
+    descriptions in a single ``.npz`` file, so that every description is only
+    embedded once, and a query only needs to embed the query itself.
+
+    Args:
+        model (str): The name of the embedding model, which is used to
+            identify the index file.
+        embed (Callable): The function to embed a list of texts into an array
+            of shape ``(N, C)``.
+        cache_dir (str | None): The directory to persist the index. Defaults
+            to None, which means to use :func:`~agentlego.utils.get_cache_dir`.
+    """
+
+    def __init__(self,
+                 model: str,
+                 embed: Callable[[List[str]], np.ndarray],
+                 cache_dir: Optional[str] = None):
+        self.model = model
+        self.embed = embed
+        cache_dir = Path(cache_dir).expanduser() if cache_dir else get_cache_dir()
+        filename = re.sub(r'[^\w.-]', '_', model)
+        self.path = cache_dir / 'embeddings' / f'{filename}.npz'
+        self._rows: Dict[str, int] = {}
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys = data['keys'].tolist()
+                embeddings = data['embeddings']
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return
+        # Ignore the broken index, and it will be rebuilt.
+        if embeddings.ndim == 2 and len(keys) == len(embeddings):
+            self._rows = {key: i for i, key in enumerate(keys)}
+            self._embeddings = embeddings
+
+    def _save(self):
+        # Save the keys and the embeddings in one file and replace the index
+        # at once, so that the rows always match the keys.
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, keys=np.array(list(self._rows)), embeddings=self._embeddings)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        return embeddings / np.linalg.norm(embeddings, axis=-1, keepdims=True)
+
+    def add(self, texts: List[str]):
+        """Embed the texts which are not in the index."""
+        with self._lock:
+            keys = {self._hash(text): text for text in texts}
+            missing = [key for key in keys if key not in self._rows]
+            if not missing:
+                return
+            embeddings = self._normalize(self.embed([keys[key] for key in missing]))
+            if self._rows and self._embeddings.shape[-1] != embeddings.shape[-1]:
+                # Rebuild the index built by another model with the same name.
+                self._rows = {}
+                missing = list(keys)
+                embeddings = self._normalize(self.embed(list(keys.values())))
+            if len(self._rows) > 0:
+                embeddings = np.concatenate([self._embeddings, embeddings])
+            for key in missing:
+                self._rows[key] = len(self._rows)
+            self._embeddings = embeddings
+            self._save()
+
+    def search(self, query: str, choices: List[str], topk: int = 5) -> List[str]:
+        """Search the most similar texts in the choices by cosine similarity.
+
+        Args:
+            query (str): The query text.
+            choices (list[str]): The texts to search.
+            topk (int): The number of texts to return. Defaults to 5.
+
+        Returns:
+            list[str]: The most similar texts, from the most similar one.
+        """
+        topk = min(topk, len(choices))
+        if topk <= 0:
+            return []
+
+        self.add(choices)
+        with self._lock:
+            rows = [self._rows[self._hash(text)] for text in choices]
+            embeddings = self._embeddings[rows]
+        query_embedding = self._normalize(self.embed([query]))[0]
+        similarity = embeddings @ query_embedding
+
+        indices = np.argpartition(-similarity, topk - 1)[:topk]
+        indices = indices[np.argsort(-similarity[indices])]
+        return [choices[i] for i in indices]
+
+
+_EMBEDDING_INDEXES: Dict[str, EmbeddingIndex] = {}
+
+
+def get_embedding_index(kind: str, model: str,
+                        embed: Callable[[List[str]], np.ndarray]) -> EmbeddingIndex:
+    """Get the shared embedding index of the model."""
+    name = f'{kind}-{model}'
+    if name not in _EMBEDDING_INDEXES:
+        _EMBEDDING_INDEXES[name] = EmbeddingIndex(name, embed)
+    return _EMBEDDING_INDEXES[name]
 
 
 def _search_with_openai(query, choices, model='text-embedding-ada-002', topk=5):
@@ -39,12 +161,13 @@ def _search_with_openai(query, choices, model='text-embedding-ada-002', topk=5):
             'please install openai to enable searching tools powered by '
             'openai')
 
-    client = OpenAI()
-    embeddings = client.embeddings.create(input=[query] + choices, model=model).data
-    similarity = _cosine_similarity(np.array(embeddings[0]), np.array(embeddings[1:]))
+    def embed(texts):
+        client = load_or_build_object(OpenAI)
+        data = client.embeddings.create(input=texts, model=model).data
+        return np.array([item.embedding for item in data])
 
-    indices = np.argsort(-similarity)[:topk]
-    return [choices[i] for i in indices]
+    index = get_embedding_index('openai', model, embed)
+    return index.search(query, choices, topk=topk)
 
 
 def _serach_with_sentence_transformers(query,
@@ -64,12 +187,11 @@ def _serach_with_sentence_transformers(query,
     """
     from sentence_transformers import SentenceTransformer
 
-    model = load_or_build_object(SentenceTransformer, model)
-    embeddings = model.encode([query] + choices)
-    similarity = _cosine_similarity(embeddings[0], embeddings[1:])
+    def embed(texts):
+        return load_or_build_object(SentenceTransformer, model).encode(texts)
 
-    indices = np.argsort(-similarity)[:topk]
-    return [choices[i] for i in indices]
+    index = get_embedding_index('st', model, embed)
+    return index.search(query, choices, topk=topk)
 
 
 def _search_with_thefuzz(query, choices, topk=5):
@@ -78,6 +200,117 @@ def _search_with_thefuzz(query, choices, topk=5):
     return [res for res, _ in result]
 
 
+_STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'in',
+    'is', 'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'you'
+])
+
+
+def tokenize(text: str) -> List[str]:
+    """Split the text into lower-case words without the stop words, including
+    the words in the camel case names like ``ImageToCanny``."""
+    text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', text)
+    text = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', text)
+    return [
+        word for word in re.findall(r'[a-z0-9]+', text.lower())
+        if word not in _STOPWORDS
+    ]
+
+
+class BM25Index:
+    """An inverted index to rank the documents by BM25.
+
+    Args:
+        k1 (float): The saturation of the term frequency. Defaults to 1.5.
+        b (float): The normalization by the document length. Defaults to 0.75.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.version = None
+        # {key: (text, length)}
+        self._docs: Dict[str, Tuple[str, int]] = {}
+        # {term: {key: term frequency}}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+
+    def add(self, key: str, text: str):
+        """Add a document, or update it if the text is changed."""
+        if key in self._docs:
+            if self._docs[key][0] == text:
+                return
+            self.remove(key)
+        terms = tokenize(text)
+        for term, freq in Counter(terms).items():
+            self._postings[term][key] = freq
+        self._docs[key] = (text, len(terms))
+        self._total_length += len(terms)
+
+    def remove(self, key: str):
+        """Remove a document."""
+        text, length = self._docs.pop(key)
+        for term in set(tokenize(text)):
+            postings = self._postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= length
+
+    def search(self, query: str, topk: int = 5) -> List[str]:
+        """Search the documents which match the query.
+
+        Args:
+            query (str): The query text.
+            topk (int): The maximum number of documents to return.
+                Defaults to 5.
+
+        Returns:
+            list[str]: The keys of the matched documents, from the most
+            relevant one.
+        """
+        num_docs = len(self._docs)
+        if num_docs == 0:
+            return []
+        avg_length = self._total_length / num_docs
+
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, freq in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._docs[key][1] / avg_length)
+                scores[key] += idf * freq * (self.k1 + 1) / (freq + norm)
+        return heapq.nlargest(topk, scores, key=scores.__getitem__)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._docs
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+_BM25_INDEX = BM25Index()
+_BM25_LOCK = threading.Lock()
+
+
+def _search_with_bm25(query, topk=5):
+    """Search tools by the BM25 ranking of the names and descriptions."""
+    with _BM25_LOCK:
+        # Only re-tokenize the tools which are changed since the last search.
+        if _BM25_INDEX.version != NAMES2TOOLS.version:
+            names = set(NAMES2TOOLS)
+            version = NAMES2TOOLS.version
+            for name in [name for name in _BM25_INDEX._docs if name not in names]:
+                _BM25_INDEX.remove(name)
+            for name in names:
+                _BM25_INDEX.add(name, f'{name} {get_toolmeta(name).description}')
+            _BM25_INDEX.version = version
+        return _BM25_INDEX.search(query, topk=topk)
+
+
 def search_tool(query: str, kind: str = 'thefuzz', topk=5) -> List[str]:
     """Search several proper tools according to the query.
 
@@ -85,18 +318,25 @@ def search_tool(query: str, kind: str = 'thefuzz', topk=5) -> List[str]:
         query (str): User input.
         kind (str): Different third-party libraries are used to assist in
             searching the appropriate tools. Optional values are "thefuzz",
-            "openai", and "st". Defaults to "thefuzz".
+            "bm25", "openai", and "st". Defaults to "thefuzz". The "bm25"
+            kind ranks by the words in the names and descriptions without
+            any model, and only returns the tools with matched words.
         topk (int): Return the top-k results. Defaults to 5.
 
     Examples:
         >>> from agentlego import search_tool
         >>> # use the thefuzz to search tools
         >>> search_tool('human pose')
+        >>> # use the BM25 index to search tools
+        >>> search_tool('human pose', kind='bm25')
         >>> # use the openai API to search tools
         >>> search_tool('human pose', kind='openai')
         >>> # use the sentence-transformers to search tools
         >>> search_tool('human pose', kind='st')
     """
+    if kind == 'bm25':
+        return _search_with_bm25(query, topk=topk)
+
     choice2names = dict()
     for name, description in list_tools(with_description=True):
         choice2names[description] = name
@@ -110,7 +350,7 @@ def search_tool(query: str, kind: str = 'thefuzz', topk=5) -> List[str]:
     elif kind == 'st':
         result = _serach_with_sentence_transformers(query, choices, topk=topk)
     else:
-        raise ValueError('The supported kinds are "thefuzz", "openai" or "st",'
+        raise ValueError('The supported kinds are "thefuzz", "bm25", "openai" or "st",'
                          f' but got {kind}.')
 
     names = []
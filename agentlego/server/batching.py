@@ -0,0 +1,113 @@
+import asyncio
+import functools
+from typing import Any, List, Optional, Set, Tuple
+
+from agentlego.tools.base import BaseTool
+from .pool import ToolBusyError, ToolWorkerPool
+
+
+class BatchScheduler:
+    """Group the concurrent calls of a tool into batched calls.
+
+    The first call of a batch waits at most ``max_batch_delay`` seconds for
+    more calls. Then all collected calls are sent to ``tool.batch()`` together,
+    and the results are split back to every caller.
+
+    The batches run in the worker pool of the tool, so that at most
+    ``pool.max_concurrency`` batches run at the same time, and the batches
+    waiting longer than ``pool.queue_timeout`` are rejected as the unbatched
+    calls.
+
+    Args:
+        tool (BaseTool): The tool to call.
+        max_batch_size (int): The maximum number of calls in a batch.
+            Defaults to 8.
+        max_batch_delay (float): The maximum seconds to wait for more calls
+            to form a batch. Defaults to 0.01.
+        pool (ToolWorkerPool | None): The worker pool to run the batched
+            calls. Defaults to None, which means to create a pool with the
+            default options.
+    """
+
+    def __init__(self,
+                 tool: BaseTool,
+                 max_batch_size: int = 8,
+                 max_batch_delay: float = 0.01,
+                 pool: Optional[ToolWorkerPool] = None):
+        assert max_batch_size >= 1, '`max_batch_size` should be positive.'
+        self.tool = tool
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.pool = pool or ToolWorkerPool(tool.name)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Keep the references of the running batches.
+        self._batches: Set[asyncio.Task] = set()
+
+    async def submit(self, kwargs: dict) -> Any:
+        """Submit a call of the tool and wait for the result.
+
+        Args:
+            kwargs (dict): The keyword arguments of the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        if self._worker is None or self._worker.done():
+            # The queue and the worker are bound to the running event loop.
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((kwargs, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_batch_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+
+            # Skip the calls whose clients have gone.
+            batch = [item for item in batch if not item[1].done()]
+            if batch:
+                task = asyncio.create_task(self._process(batch))
+                self._batches.add(task)
+                task.add_done_callback(self._batches.discard)
+
+    async def _process(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            outputs = await self.pool.run(self.tool.batch,
+                                          [kwargs for kwargs, _ in batch])
+        except ToolBusyError as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception:
+            # Call one by one to only report the error to the failed callers.
+            await asyncio.gather(*[self._process_one(*item) for item in batch])
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    async def _process_one(self, kwargs: dict, future: asyncio.Future):
+        try:
+            output = await self.pool.run(functools.partial(self.tool, **kwargs))
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(output)
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+
+class ToolBusyError(RuntimeError):
+    """The error raised when a tool cannot accept more requests.
+
+    Args:
+        msg (str): The error message.
+        status_code (int): The HTTP status code to respond.
+        retry_after (int): The seconds for the client to wait before retrying.
+    """
+
+    def __init__(self, msg: str, status_code: int, retry_after: int):
+        super().__init__(msg)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ToolWorkerPool:
+    """The dedicated worker threads of a tool with a bounded waiting queue.
+
+    Every tool has its own pool, so that heavy tools cannot occupy the threads
+    of light tools, and a tool which is not thread-safe can be limited to run
+    one call at a time.
+
+    Args:
+        name (str): The name of the tool.
+        max_concurrency (int): The maximum number of concurrent calls.
+            Defaults to 4.
+        max_queue (int): The maximum number of requests waiting for a free
+            worker. The requests beyond will be rejected with 429 directly.
+            Defaults to 32.
+        queue_timeout (float | None): The maximum seconds to wait for a free
+            worker. The request will be rejected with 503 after timeout.
+            Defaults to None, which means to wait until a free worker.
+        retry_after (int): The value of the ``Retry-After`` header in the
+            rejection responses. Defaults to 1.
+    """
+
+    def __init__(self,
+                 name: str,
+                 max_concurrency: int = 4,
+                 max_queue: int = 32,
+                 queue_timeout: Optional[float] = None,
+                 retry_after: int = 1):
+        assert max_concurrency >= 1, '`max_concurrency` should be positive.'
+        assert max_queue >= 0, '`max_queue` should not be negative.'
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix=f'agentlego-{name}')
+        self._num_requests = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def reserve(self):
+        """Reserve a place for a request, and reject it if both all workers
+        and the waiting queue are full."""
+        if self._num_requests >= self.max_concurrency + self.max_queue:
+            raise ToolBusyError(
+                f'Too many requests of the tool `{self.name}`.',
+                status_code=429,
+                retry_after=self.retry_after)
+        self._num_requests += 1
+        try:
+            yield
+        finally:
+            self._num_requests -= 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a function in the worker threads.
+
+        Args:
+            func (Callable): The function to run.
+            *args: The positional arguments of the function.
+            **kwargs: The keyword arguments of the function.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        if self._semaphore is None:
+            # Create in the running event loop.
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ToolBusyError(
+                f'Timeout to wait for a free worker of the tool `{self.name}`.',
+                status_code=503,
+                retry_after=self.retry_after)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor,
+                                              functools.partial(func, *args, **kwargs))
+        finally:
+            self._semaphore.release()
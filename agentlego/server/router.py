@@ -0,0 +1,273 @@
+import asyncio
+import itertools
+import json
+import re
+import socket
+import time
+from collections import OrderedDict
+from multiprocessing.process import BaseProcess
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agentlego.utils.blobs import BLOB_DIGESTS_HEADER, BLOB_REF_MEDIA_TYPE
+
+# The headers which only make sense for a single connection.
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+    'trailers', 'transfer-encoding', 'upgrade', 'host', 'content-length'
+}
+
+# The digests in the file parts which refer to blobs of a multipart request.
+_BLOB_REF_PATTERN = re.compile(
+    rb'content-type:[ \t]*' + re.escape(BLOB_REF_MEDIA_TYPE.encode()) +
+    rb'[^\r\n]*\r\n(?:[^\r\n]+\r\n)*\r\n([0-9a-f]{64})', re.IGNORECASE)
+
+
+def shard_tools(tools: Sequence[str], num_workers: int,
+                replicate: Sequence[str] = ()) -> List[List[str]]:
+    """Assign the tools to workers.
+
+    Args:
+        tools (Sequence[str]): The names of all tools.
+        num_workers (int): The number of workers.
+        replicate (Sequence[str]): The tools to deploy on every worker, and the
+            other tools are distributed across workers in turn.
+
+    Returns:
+        list[list[str]]: The tools of every worker.
+    """
+    shards = [[] for _ in range(num_workers)]
+    sharded = [name for name in tools if name not in replicate]
+    for i, name in enumerate(sharded):
+        shards[i % num_workers].append(name)
+    for name in tools:
+        if name in replicate:
+            for shard in shards:
+                shard.append(name)
+    return shards
+
+
+def find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_workers(processes: Sequence[BaseProcess],
+                     ports: Sequence[int],
+                     interval: float = 0.5):
+    """Block until all worker processes are listening on their ports."""
+    for process, port in zip(processes, ports):
+        while True:
+            if not process.is_alive():
+                raise RuntimeError(f'The worker process at port {port} exited '
+                                   f'with code {process.exitcode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=interval).close()
+                break
+            except OSError:
+                time.sleep(interval)
+
+
+class WorkerRouter:
+    """An ASGI application to forward the tool requests to worker processes.
+
+    The requests of the paths in ``upstreams`` are forwarded as-is, and the
+    replicated tools are forwarded to their workers in turn. The other
+    requests, like the OpenAPI specification and the docs, are handled by
+    the wrapped application, so that clients see the same API as a single
+    process server.
+
+    Since every worker keeps its own upload cache, the router remembers the
+    worker of every blob by the ``X-AgentLego-Blobs`` response header, and
+    sends the requests which refer to the blob to the same worker if it
+    deploys the tool. The blobs uploaded by ``POST /blobs`` are stored on all
+    workers, and ``GET /cache/stats`` gathers the statistics of all workers.
+
+    Args:
+        app: The wrapped ASGI application.
+        upstreams (dict): The mapping from the tool path to the base URLs of
+            the workers which deploy the tool.
+        max_blobs (int): The maximum number of blobs to remember the worker.
+            Defaults to 4096.
+    """
+
+    def __init__(self, app, upstreams: Dict[str, List[str]], max_blobs: int = 4096):
+        self.app = app
+        self.upstreams = {path: list(urls) for path, urls in upstreams.items()}
+        self.workers = list(dict.fromkeys(
+            url for urls in upstreams.values() for url in urls))
+        self.max_blobs = max_blobs
+        self._cycles = {
+            path: itertools.cycle(urls)
+            for path, urls in upstreams.items()
+        }
+        # {digest: url} of the worker which stores the blob.
+        self._blob_workers: OrderedDict = OrderedDict()
+        self._session = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            path, method = scope['path'], scope['method']
+            if path in self.upstreams:
+                return await self.forward(scope, receive, send)
+            elif path == '/blobs' and method == 'POST':
+                return await self.upload_blob(receive, send)
+            elif path.startswith('/blobs/') and method == 'HEAD':
+                return await self.has_blob(path[len('/blobs/'):], send)
+            elif path == '/cache/stats' and method == 'GET':
+                return await self.cache_stats(send)
+        await self.app(scope, receive, send)
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None:
+            # Create in the running event loop.
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0),
+                timeout=aiohttp.ClientTimeout(total=None),
+                auto_decompress=False,
+            )
+        return self._session
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+        return body
+
+    @staticmethod
+    async def _send_json(send, status: int, content):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': json.dumps(content).encode()})
+
+    async def _request_all(self, method: str, path: str,
+                           **kwargs) -> List[Optional[Tuple[int, bytes]]]:
+        """Send a request to all workers, and get the status and the body of
+        every response, or None if the worker is unavailable."""
+        import aiohttp
+
+        async def _request(url):
+            try:
+                async with self._get_session().request(method, url + path,
+                                                       **kwargs) as response:
+                    return response.status, await response.read()
+            except aiohttp.ClientConnectionError:
+                return None
+
+        return await asyncio.gather(*[_request(url) for url in self.workers])
+
+    def _remember_blobs(self, digests: Sequence[str], url: str):
+        for digest in digests:
+            self._blob_workers[digest] = url
+            self._blob_workers.move_to_end(digest)
+        while len(self._blob_workers) > self.max_blobs:
+            self._blob_workers.popitem(last=False)
+
+    def _select_worker(self, path: str, body: bytes) -> str:
+        urls = self.upstreams[path]
+        if len(urls) > 1:
+            # Prefer the worker which stores the referred blobs.
+            for digest in _BLOB_REF_PATTERN.findall(body):
+                url = self._blob_workers.get(digest.decode())
+                if url in urls:
+                    return url
+        return next(self._cycles[path])
+
+    async def upload_blob(self, receive, send):
+        body = await self._read_body(receive)
+        # Store the blob on all workers, so that every tool can refer to it.
+        results = [
+            res for res in await self._request_all('POST', '/blobs', data=body)
+            if res is not None
+        ]
+        if not results:
+            return await self._send_json(
+                send, 503, {'detail': 'The workers are unavailable.'})
+        status, content = next((res for res in results if res[0] == 200), results[0])
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def has_blob(self, digest: str, send):
+        results = await self._request_all('HEAD', f'/blobs/{digest}')
+        owners = [
+            url for url, res in zip(self.workers, results)
+            if res is not None and res[0] == 200
+        ]
+        if owners and digest not in self._blob_workers:
+            self._remember_blobs([digest], owners[0])
+        await send({
+            'type': 'http.response.start',
+            'status': 200 if owners else 404,
+            'headers': [],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def cache_stats(self, send):
+        results = await self._request_all('GET', '/cache/stats')
+        workers = {
+            url: json.loads(res[1]) if res is not None and res[0] == 200 else None
+            for url, res in zip(self.workers, results)
+        }
+        await self._send_json(send, 200, {'workers': workers})
+
+    async def forward(self, scope, receive, send):
+        import aiohttp
+
+        body = await self._read_body(receive)
+        worker = self._select_worker(scope['path'], body)
+        raw_path = scope.get('raw_path') or scope['path'].encode()
+        url = worker + raw_path.decode()
+        if scope['query_string']:
+            url += '?' + scope['query_string'].decode()
+        headers = [(k.decode('latin-1'), v.decode('latin-1'))
+                   for k, v in scope['headers']
+                   if k.decode('latin-1').lower() not in HOP_BY_HOP_HEADERS]
+
+        started = False
+        try:
+            async with self._get_session().request(
+                    scope['method'], url, headers=headers, data=body) as response:
+                started = True
+                digests = response.headers.get(BLOB_DIGESTS_HEADER)
+                if digests:
+                    self._remember_blobs(digests.split(','), worker)
+                await send({
+                    'type': 'http.response.start',
+                    'status': response.status,
+                    'headers': [(k.encode('latin-1'), v.encode('latin-1'))
+                                for k, v in response.headers.items()
+                                if k.lower() not in HOP_BY_HOP_HEADERS],
+                })
+                async for chunk in response.content.iter_chunked(65536):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True
+                    })
+                await send({'type': 'http.response.body', 'body': b''})
+        except aiohttp.ClientConnectionError:
+            if started:
+                raise
+            await send({
+                'type': 'http.response.start',
+                'status': 503,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'retry-after', b'1')],
+            })
+            await send({
+                'type': 'http.response.body',
+                'body': b'{"detail":"The worker of the tool is unavailable."}',
+            })
@@ -1,28 +1,37 @@
 import base64
+import hashlib
 import inspect
+import json
 import logging
 import socket
 import sys
 from contextlib import asynccontextmanager
 from io import BytesIO
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
-from agentlego.apis.tool import (extract_all_tools, list_tools, load_tool,
+from agentlego.apis.tool import (extract_all_tools, get_toolmeta, list_tools, load_tool,
                                  register_all_tools)
 from agentlego.parsers import NaiveParser
+from agentlego.schema import ToolMeta
 from agentlego.tools.base import BaseTool
 from agentlego.types import AudioIO
 from agentlego.types import File as FileType
 from agentlego.types import ImageIO
-from agentlego.utils import resolve_module
+from agentlego.utils import OBJECT_CACHE, resolve_module
+from agentlego.utils.blobs import BLOB_DIGESTS_HEADER, BLOB_REF_MEDIA_TYPE, BlobStore
+from agentlego.utils.multipart import encode_multipart
+from .batching import BatchScheduler
+from .pool import ToolBusyError, ToolWorkerPool
+from .router import WorkerRouter, find_free_port, shard_tools, wait_for_workers
 
 try:
     import rich
     import typer
     import uvicorn
-    from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-    from fastapi.responses import RedirectResponse
+    from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import JSONResponse, RedirectResponse, Response
     from makefun import create_function
     from pydantic import Field
     from rich.table import Table
@@ -34,6 +43,13 @@ except ImportError:
 
 cli = typer.Typer(add_completion=False, no_args_is_help=True)
 
+# The media types of binary outputs in the `multipart/mixed` responses.
+BINARY_MEDIA_TYPES = {
+    ImageIO: 'image/png',
+    AudioIO: 'audio/wav',
+    FileType: 'application/octet-stream',
+}
+
 
 def get_host_ip(host: str):
     if host in ['127.0.0.1', 'localhost']:
@@ -52,7 +68,7 @@ def get_host_ip(host: str):
             s.close()
 
 
-def create_input_params(tool: BaseTool) -> List[inspect.Parameter]:
+def create_input_params(tool: Union[BaseTool, ToolMeta]) -> List[inspect.Parameter]:
     params = []
     for p in tool.inputs:
         field_kwargs = {}
@@ -82,7 +98,7 @@ def create_input_params(tool: BaseTool) -> List[inspect.Parameter]:
     return params
 
 
-def create_output_annotation(tool: BaseTool):
+def create_output_annotation(tool: Union[BaseTool, ToolMeta]):
     output_schema = []
 
     for p in tool.outputs:
@@ -113,34 +129,96 @@ def create_output_annotation(tool: BaseTool):
         return Tuple.copy_with(tuple(output_schema))
 
 
-def add_tool(tool: BaseTool, app: FastAPI):
-    tool_name = tool.name.replace(' ', '_')
-
-    input_params = create_input_params(tool)
-    return_annotation = create_output_annotation(tool)
+def add_route(app: FastAPI, toolmeta: ToolMeta, call: Callable):
+    """Add the route of a tool, whose signature and OpenAPI schema are
+    generated from the tool meta."""
+    tool_name = toolmeta.name.replace(' ', '_')
+    input_params = create_input_params(toolmeta)
+    # The request is used to negotiate the response format by `Accept` header,
+    # and the response is used to advertise the stored blobs.
+    input_params.append(
+        inspect.Parameter(
+            '_request', inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+    input_params.append(
+        inspect.Parameter(
+            '_response', inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+    return_annotation = create_output_annotation(toolmeta)
     signature = inspect.Signature(input_params, return_annotation=return_annotation)
+    binary_outputs = any(p.type in BINARY_MEDIA_TYPES for p in toolmeta.outputs)
+
+    app.add_api_route(
+        f'/{tool_name}',
+        endpoint=create_function(signature, call),
+        methods=['POST'],
+        operation_id=tool_name,
+        summary=toolmeta.description,
+        responses={200: {
+            'content': {
+                'multipart/mixed': {}
+            }
+        }} if binary_outputs else None,
+    )
+
+
+def add_proxy_route(app: FastAPI, toolmeta: ToolMeta):
+    """Add the route of a tool served by other processes, which is only used
+    to generate the OpenAPI spec without loading the tool."""
 
-    def _call(**kwargs):
+    async def call(_request: Request, _response: Response, **kwargs):
+        raise HTTPException(
+            status_code=503, detail=f'The tool `{toolmeta.name}` is not available.')
+
+    add_route(app, toolmeta, call)
+
+
+def add_tool(tool: BaseTool,
+             app: FastAPI,
+             pool: Optional[ToolWorkerPool] = None,
+             batcher: Optional[BatchScheduler] = None,
+             blobs: Optional[BlobStore] = None):
+    tool_name = tool.name.replace(' ', '_')
+    pool = pool or ToolWorkerPool(tool_name)
+    binary_outputs = any(p.type in BINARY_MEDIA_TYPES for p in tool.outputs)
+
+    def _read_file(upload: UploadFile, digests: List[str]) -> BytesIO:
+        if upload.content_type == BLOB_REF_MEDIA_TYPE:
+            # The client refers to a blob uploaded before.
+            digest = upload.file.read().decode().strip()
+            data = blobs.get(digest) if blobs is not None else None
+            if data is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f'The blob `{digest}` is not found, please upload the '
+                    'content again.')
+        else:
+            data = upload.file.read()
+            digest = blobs.put(data) if blobs is not None else None
+        if digest is not None:
+            digests.append(digest)
+        return BytesIO(data)
+
+    def _parse_inputs(kwargs, digests: List[str]):
         args = {}
         for p in tool.inputs:
             data = kwargs[p.name]
             if p.type is ImageIO:
                 from PIL import Image
-                data = ImageIO(Image.open(data.file))
+                data = ImageIO(Image.open(_read_file(data, digests)))
             elif p.type is AudioIO:
                 import torchaudio
                 file_format = data.filename.rpartition('.')[-1] or None
-                raw, sr = torchaudio.load(data.file, format=file_format)
+                raw, sr = torchaudio.load(_read_file(data, digests), format=file_format)
                 data = AudioIO(raw, sampling_rate=sr)
             elif p.type is FileType:
-                data = FileType(data.file.read())
+                data = FileType(_read_file(data, digests).getvalue())
             elif data is None:
                 continue
             else:
                 data = p.type(data)
             args[p.name] = data
+        return args
 
-        outs = tool(**args)
+    def _format_outputs(outs, binary=False):
         if not isinstance(outs, tuple):
             outs = [outs]
 
@@ -149,16 +227,32 @@ def add_tool(tool: BaseTool, app: FastAPI):
             if p.type is ImageIO:
                 file = BytesIO()
                 out.to_pil().save(file, format='png')
-                out = base64.b64encode(file.getvalue()).decode()
+                out = file.getvalue()
             elif p.type is AudioIO:
                 import torchaudio
                 file = BytesIO()
                 torchaudio.save(file, out.to_tensor(), out.sampling_rate, format='wav')
-                out = base64.b64encode(file.getvalue()).decode()
+                out = file.getvalue()
             elif p.type is FileType:
-                out = base64.b64encode(out.to_bytes()).decode()
+                out = out.to_bytes()
             res.append(out)
 
+        if binary:
+            # Send the binary outputs as-is in a `multipart/mixed` response.
+            parts = []
+            for out, p in zip(res, tool.outputs):
+                if p.type in BINARY_MEDIA_TYPES:
+                    parts.append(({'Content-Type': BINARY_MEDIA_TYPES[p.type]}, out))
+                else:
+                    parts.append(({'Content-Type': 'application/json'},
+                                  json.dumps(out).encode()))
+            content, media_type = encode_multipart(parts)
+            return Response(content=content, media_type=media_type)
+
+        res = [
+            base64.b64encode(out).decode() if p.type in BINARY_MEDIA_TYPES else out
+            for out, p in zip(res, tool.outputs)
+        ]
         if len(res) == 0:
             return None
         elif len(res) == 1:
@@ -166,19 +260,74 @@ def add_tool(tool: BaseTool, app: FastAPI):
         else:
             return tuple(res)
 
-    def call(**kwargs):
+    def _call(kwargs, binary, digests):
+        return _format_outputs(tool(**_parse_inputs(kwargs, digests)), binary)
+
+    async def call(_request: Request, _response: Response, **kwargs):
+        binary = binary_outputs and 'multipart/mixed' in [
+            item.partition(';')[0].strip()
+            for item in _request.headers.get('accept', '').split(',')
+        ]
+        digests = []
         try:
-            return _call(**kwargs)
+            async with pool.reserve():
+                if batcher is not None:
+                    # The batches run in the pool with the same limits.
+                    args = await run_in_threadpool(_parse_inputs, kwargs, digests)
+                    outs = await batcher.submit(args)
+                    res = await run_in_threadpool(_format_outputs, outs, binary)
+                else:
+                    res = await pool.run(_call, kwargs, binary, digests)
+        except ToolBusyError as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=str(e),
+                headers={'Retry-After': str(e.retry_after)})
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=400, detail=repr(e))
 
-    app.add_api_route(
-        f'/{tool_name}',
-        endpoint=create_function(signature, call),
-        methods=['POST'],
-        operation_id=tool_name,
-        summary=tool.toolmeta.description,
-    )
+        if digests:
+            response = res if isinstance(res, Response) else _response
+            response.headers[BLOB_DIGESTS_HEADER] = ','.join(digests)
+        return res
+
+    add_route(app, tool.toolmeta, call)
+
+
+TOOL_OPTIONS = ('max_concurrency', 'max_queue', 'queue_timeout', 'max_batch_size',
+                'max_batch_delay_ms', 'idle_unload')
+
+
+def load_tool_config(path: Optional[Path]) -> Dict[str, dict]:
+    """Load the per-tool options from a YAML or JSON file.
+
+    The file maps the tool class name to its options, and the unspecified
+    options use the values from the command line. For example:
+
+    .. code:: yaml
+
+        TextToImage:
+          max_concurrency: 1
+          max_queue: 4
+        Calculator:
+          max_concurrency: 16
+    """
+    if path is None:
+        return {}
+
+    import yaml
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+
+    for name, options in config.items():
+        unknown = set(options) - set(TOOL_OPTIONS)
+        if unknown:
+            raise typer.BadParameter(
+                f'Unknown options {sorted(unknown)} of tool `{name}`, the available '
+                f'options are {list(TOOL_OPTIONS)}.')
+    return config
 
 
 @asynccontextmanager
@@ -188,6 +337,134 @@ async def lifespan(app: FastAPI):
     yield
 
 
+def create_app(tools: List[str],
+               tool_options: Dict[str, dict],
+               device: str,
+               setup: bool,
+               extra: Optional[List[Path]],
+               title: str,
+               server_url: str,
+               blob_cache_size: int = 0,
+               proxy: bool = False,
+               preload: bool = False) -> FastAPI:
+    app = FastAPI(
+        title=title,
+        openapi_url='/openapi.json',
+        lifespan=lifespan,
+        servers=[{'url': server_url}],
+    )
+
+    @app.get('/', include_in_schema=False)
+    async def root():
+        return RedirectResponse(url='/openapi.json')
+
+    @app.get('/cache/stats', include_in_schema=False)
+    async def cache_stats():
+        return OBJECT_CACHE.stats()
+
+    openapi_cache = {}
+
+    @app.middleware('http')
+    async def openapi_etag(request: Request, call_next):
+        # Serve the OpenAPI spec with a strong ETag, so that the clients can
+        # revalidate their cached spec by `If-None-Match`.
+        if request.url.path != app.openapi_url:
+            return await call_next(request)
+        if not openapi_cache:
+            content = JSONResponse(app.openapi()).body
+            openapi_cache['content'] = content
+            openapi_cache['etag'] = '"' + hashlib.sha256(content).hexdigest() + '"'
+        etag = openapi_cache['etag']
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in [item.strip() for item in if_none_match.split(',')]:
+            return Response(status_code=304, headers={'ETag': etag})
+        return Response(
+            openapi_cache['content'],
+            media_type='application/json',
+            headers={'ETag': etag})
+
+    if blob_cache_size > 0:
+        blobs = BlobStore(max_bytes=blob_cache_size * 1024 * 1024)
+
+        @app.head('/blobs/{digest}', include_in_schema=False)
+        async def has_blob(digest: str):
+            return Response(status_code=200 if digest in blobs else 404)
+
+        @app.post('/blobs', include_in_schema=False)
+        async def upload_blob(request: Request):
+            digest = blobs.put(await request.body())
+            if digest is None:
+                raise HTTPException(status_code=413, detail='The blob is too large.')
+            return {'digest': digest}
+    else:
+        blobs = None
+
+    if extra is not None:
+        for path in extra:
+            register_all_tools(resolve_module(path))
+
+    setup_futures = []
+    for name in tools:
+        if proxy:
+            # The tools are served by the workers, and the routes are only
+            # generated from the manifest.
+            add_proxy_route(app, get_toolmeta(name))
+            continue
+
+        tool = load_tool(name, device=device)
+        tool.set_parser(NaiveParser)
+        options = tool_options[name]
+        tool.idle_unload_seconds = options['idle_unload']
+        if setup and preload:
+            # Setup all tools concurrently.
+            setup_futures.append(tool.preload())
+        elif setup:
+            tool._setup_once()
+
+        pool = ToolWorkerPool(
+            tool.name,
+            max_concurrency=options['max_concurrency'],
+            max_queue=options['max_queue'],
+            queue_timeout=options['queue_timeout'],
+        )
+        # Only batch the tools which implement batched inference, since the
+        # default `apply_batch` just calls `apply` one by one.
+        if (options['max_batch_size'] > 1
+                and type(tool).apply_batch is not BaseTool.apply_batch):
+            batcher = BatchScheduler(
+                tool,
+                max_batch_size=options['max_batch_size'],
+                max_batch_delay=options['max_batch_delay_ms'] / 1000,
+                pool=pool,
+            )
+        else:
+            batcher = None
+
+        add_tool(tool, app, pool=pool, batcher=batcher, blobs=blobs)
+
+    for future in setup_futures:
+        future.result()
+
+    return app
+
+
+def serve_worker(tools: List[str], tool_options: Dict[str, dict], device: str,
+                 setup: bool, extra: Optional[List[Path]], title: str, server_url: str,
+                 port: int, blob_cache_size: int, preload: bool):
+    """The entry of the worker processes."""
+    app = create_app(
+        tools,
+        tool_options,
+        device,
+        setup,
+        extra,
+        title,
+        server_url,
+        blob_cache_size,
+        preload=preload)
+    uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
+
+
 @cli.command(no_args_is_help=True)
 def start(
         tools: List[str] = typer.Argument(
@@ -195,6 +472,10 @@ def start(
         device: str = typer.Option(
             'cuda:0', help='The device to use to deploy the tools.'),
         setup: bool = typer.Option(True, help='Setup tools during starting the server.'),
+        preload: bool = typer.Option(
+            False,
+            help='Setup the tools concurrently instead of one by one during starting '
+            'the server, which is faster but needs more peak memory.'),
         extra: Optional[List[Path]] = typer.Option(
             None,
             help='The extra Python source files or modules includes tools.',
@@ -205,33 +486,108 @@ def start(
         host: str = typer.Option('127.0.0.1', help='The server address.'),
         port: int = typer.Option(16180, help='The server port.'),
         title: str = typer.Option('AgentLego', help='The title of the tool collection.'),
+        max_batch_size: int = typer.Option(
+            1,
+            help='The maximum number of concurrent requests of a tool to be merged '
+            'into a batched call. Defaults to 1, which means to disable batching.'),
+        max_batch_delay_ms: float = typer.Option(
+            10, help='The maximum milliseconds to wait for more requests to form a '
+            'batch.'),
+        max_concurrency: int = typer.Option(
+            4, help='The maximum number of concurrent calls of every tool.'),
+        max_queue: int = typer.Option(
+            32,
+            help='The maximum number of requests waiting for every tool. The requests '
+            'beyond will be rejected with 429.'),
+        queue_timeout: Optional[float] = typer.Option(
+            None,
+            help='The maximum seconds for a request to wait for a free worker. The '
+            'request will be rejected with 503 after timeout.',
+            show_default=False),
+        config: Optional[Path] = typer.Option(
+            None,
+            help='The YAML or JSON file to specify the above options of every tool.',
+            exists=True,
+            dir_okay=False,
+            show_default=False),
+        workers: int = typer.Option(
+            1,
+            help='The number of worker processes. If greater than 1, the tools are '
+            'sharded across the workers behind a router at the server port.'),
+        replicate: Optional[List[str]] = typer.Option(
+            None,
+            help='The tools to deploy on every worker instead of one of them.',
+            show_default=False),
+        idle_unload: Optional[float] = typer.Option(
+            None,
+            help='Unload the models of a tool after it has not been called for the '
+            'seconds, and load again on the next call. Defaults to never.',
+            show_default=False),
+        blob_cache_size: int = typer.Option(
+            256,
+            help='The maximum megabytes of the uploaded files kept by the server, '
+            'which can be referred by digest in the following requests. Set to 0 to '
+            'disable.'),
 ):
     """Start a tool server with the specified tools."""
-    app = FastAPI(
-        title=title,
-        openapi_url='/openapi.json',
-        lifespan=lifespan,
-        servers=[{'url': f'http://{get_host_ip(host)}:{port}'}],
-    )
-
-    @app.get('/', include_in_schema=False)
-    async def root():
-        return RedirectResponse(url='/openapi.json')
-
-    if extra is not None:
-        for path in extra:
-            register_all_tools(resolve_module(path))
-
+    tool_config = load_tool_config(config)
+    tool_options = {}
     for name in tools:
-        tool = load_tool(name, device=device)
-        tool.set_parser(NaiveParser)
-        if setup:
-            tool.setup()
-            tool._is_setup = True
-
-        add_tool(tool, app)
-
-    uvicorn.run(app, host=host, port=port)
+        options = dict(
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            queue_timeout=queue_timeout,
+            max_batch_size=max_batch_size,
+            max_batch_delay_ms=max_batch_delay_ms,
+            idle_unload=idle_unload,
+        )
+        options.update(tool_config.get(name, {}))
+        tool_options[name] = options
+
+    server_url = f'http://{get_host_ip(host)}:{port}'
+
+    if workers <= 1:
+        app = create_app(
+            tools,
+            tool_options,
+            device,
+            setup,
+            extra,
+            title,
+            server_url,
+            blob_cache_size,
+            preload=preload)
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    import multiprocessing
+    ctx = multiprocessing.get_context('spawn')
+
+    shards = [shard for shard in shard_tools(tools, workers, replicate or []) if shard]
+    ports = [find_free_port() for _ in shards]
+    processes = []
+    for shard, worker_port in zip(shards, ports):
+        process = ctx.Process(
+            target=serve_worker,
+            args=(shard, tool_options, device, setup, extra, title, server_url,
+                  worker_port, blob_cache_size, preload),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+
+    # The router only uses the tool metas to generate the OpenAPI spec, and it
+    # forwards the blob and cache requests to the workers.
+    app = create_app(
+        tools, tool_options, device, False, extra, title, server_url, proxy=True)
+    upstreams = {}
+    for shard, worker_port in zip(shards, ports):
+        for name in shard:
+            path = '/' + get_toolmeta(name).name.replace(' ', '_')
+            upstreams.setdefault(path, []).append(f'http://127.0.0.1:{worker_port}')
+
+    wait_for_workers(processes, ports)
+    uvicorn.run(WorkerRouter(app, upstreams), host=host, port=port)
 
 
 @cli.command(name='list')
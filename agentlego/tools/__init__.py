@@ -1,21 +1,63 @@
+import importlib
+
 from .base import BaseTool
-from .calculator import Calculator
 from .func import make_tool
-from .image_canny import CannyTextToImage, ImageToCanny
-from .image_depth import DepthTextToImage, ImageToDepth
-from .image_editing import ImageExpansion, ImageStylization, ObjectRemove, ObjectReplace
-from .image_pose import HumanBodyPose, HumanFaceLandmark, PoseToImage
-from .image_scribble import ImageToScribble, ScribbleTextToImage
-from .image_text import ImageDescription, TextToImage
-from .imagebind import AudioImageToImage, AudioTextToImage, AudioToImage, ThermalToImage
-from .object_detection import ObjectDetection, TextToBbox
-from .ocr import OCR
-from .scholar import *  # noqa: F401, F403
-from .search import BingSearch, GoogleSearch
-from .segmentation import SegmentAnything, SegmentObject, SemanticSegmentation
-from .speech_text import SpeechToText, TextToSpeech
-from .translation import Translation
-from .vqa import VQA
+
+# The modules of the built-in tools, which are only imported when the tool is
+# used for the first time, to avoid the import cost of all tools.
+TOOL_MODULES = {
+    'Calculator': '.calculator.python_calculator',
+    'CannyTextToImage': '.image_canny.canny_to_image',
+    'ImageToCanny': '.image_canny.image_to_canny',
+    'DepthTextToImage': '.image_depth.depth_to_image',
+    'ImageToDepth': '.image_depth.image_to_depth',
+    'ImageExpansion': '.image_editing.expansion',
+    'ObjectRemove': '.image_editing.remove',
+    'ObjectReplace': '.image_editing.replace',
+    'ImageStylization': '.image_editing.stylization',
+    'HumanFaceLandmark': '.image_pose.facelandmark',
+    'HumanBodyPose': '.image_pose.image_to_pose',
+    'PoseToImage': '.image_pose.pose_to_image',
+    'ImageToScribble': '.image_scribble.image_to_scribble',
+    'ScribbleTextToImage': '.image_scribble.scribble_to_image',
+    'ImageDescription': '.image_text.image_to_text',
+    'TextToImage': '.image_text.text_to_image',
+    'AudioImageToImage': '.imagebind.anything_to_image',
+    'AudioTextToImage': '.imagebind.anything_to_image',
+    'AudioToImage': '.imagebind.anything_to_image',
+    'ThermalToImage': '.imagebind.anything_to_image',
+    'ObjectDetection': '.object_detection.object_detection',
+    'TextToBbox': '.object_detection.text_to_bbox',
+    'OCR': '.ocr.ocr',
+    'ArxivSearch': '.scholar.arxiv_search',
+    'GoogleScholarArticle': '.scholar.google_scholar',
+    'GoogleScholarAuthorId': '.scholar.google_scholar',
+    'GoogleScholarAuthorInfo': '.scholar.google_scholar',
+    'GoogleScholarCitation': '.scholar.google_scholar',
+    'BingSearch': '.search.bing',
+    'GoogleSearch': '.search.google',
+    'SegmentAnything': '.segmentation.segment_anything',
+    'SegmentObject': '.segmentation.segment_anything',
+    'SemanticSegmentation': '.segmentation.semantic_segmentation',
+    'SpeechToText': '.speech_text.speech_to_text',
+    'TextToSpeech': '.speech_text.text_to_speech',
+    'Translation': '.translation.translation',
+    'VQA': '.vqa.visual_question_answering',
+}
+
+
+def __getattr__(name: str):
+    if name in TOOL_MODULES:
+        module = importlib.import_module(TOOL_MODULES[name], __name__)
+        tool = getattr(module, name)
+        globals()[name] = tool
+        return tool
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(TOOL_MODULES))
+
 
 __all__ = [
     'CannyTextToImage', 'ImageToCanny', 'DepthTextToImage', 'ImageToDepth',
@@ -25,5 +67,6 @@ __all__ = [
     'SegmentObject', 'SegmentAnything', 'SemanticSegmentation', 'ImageStylization',
     'AudioToImage', 'ThermalToImage', 'AudioImageToImage', 'AudioTextToImage',
     'SpeechToText', 'TextToSpeech', 'Translation', 'GoogleSearch', 'Calculator',
-    'BaseTool', 'make_tool', 'BingSearch',
+    'BaseTool', 'make_tool', 'BingSearch', 'ArxivSearch', 'GoogleScholarArticle',
+    'GoogleScholarAuthorId', 'GoogleScholarAuthorInfo', 'GoogleScholarCitation'
 ]
@@ -1,15 +1,60 @@
-import copy
+import gc
+import sys
+import threading
+import time
+import weakref
 from abc import ABCMeta, abstractmethod
-from typing import Any, Callable, Mapping, Optional, Tuple, Union
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from agentlego.parsers import DefaultParser
 from agentlego.schema import Parameter, ToolMeta
+from agentlego.types import IOType
+from agentlego.utils import OBJECT_CACHE, run_in_executor
 from .utils.parameters import extract_toolmeta
 
+# The attributes to manage the lifecycle, which are not the state of setup.
+_LIFECYCLE_ATTRS = ('_is_setup', '_setup_state', '_num_active', '_last_used',
+                    '_lifecycle_lock')
+_MISSING = object()
+
+
+class _IdleReaper:
+    """A daemon thread to tear down the tools which have been idle for longer
+    than their ``idle_unload_seconds``."""
+
+    interval = 1.
+
+    def __init__(self):
+        self._tools = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, tool: 'BaseTool'):
+        with self._lock:
+            self._tools.add(tool)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='agentlego-idle-reaper', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                tools = list(self._tools)
+            for tool in tools:
+                tool._unload_if_idle()
+
+
+_IDLE_REAPER = _IdleReaper()
+
 
 class BaseTool(metaclass=ABCMeta):
     default_desc: Optional[str] = None
 
+    _idle_unload_seconds: Optional[float] = None
+
     def __init__(
         self,
         toolmeta: Union[dict, ToolMeta, None] = None,
@@ -18,6 +63,7 @@ class BaseTool(metaclass=ABCMeta):
         self.toolmeta = self.get_default_toolmeta(toolmeta)
         self.set_parser(parser)
         self._is_setup = False
+        self._init_lifecycle()
 
     @property
     def name(self) -> str:
@@ -25,15 +71,27 @@ class BaseTool(metaclass=ABCMeta):
 
     @name.setter
     def name(self, val: str):
-        self.toolmeta.name = val
+        self.toolmeta = self.toolmeta.replace(name=val)
 
     @property
     def description(self) -> str:
-        return self.parser.refine_description()
+        return self.parser.description
 
     @description.setter
     def description(self, val: str):
-        self.toolmeta.description = val
+        self.toolmeta = self.toolmeta.replace(description=val)
+
+    @property
+    def idle_unload_seconds(self) -> Optional[float]:
+        """Tear down the tool after it has not been called for the seconds, and
+        the next call will setup it again. None means never."""
+        return self._idle_unload_seconds
+
+    @idle_unload_seconds.setter
+    def idle_unload_seconds(self, val: Optional[float]):
+        self._idle_unload_seconds = val
+        if val is not None:
+            _IDLE_REAPER.watch(self)
 
     @property
     def inputs(self) -> Tuple[Parameter, ...]:
@@ -51,14 +109,14 @@ class BaseTool(metaclass=ABCMeta):
     def get_default_toolmeta(cls, override=None) -> ToolMeta:
         if isinstance(override, dict):
             override = ToolMeta(**override)
-        override = ToolMeta() if override is None else copy.deepcopy(override)
+        override = ToolMeta() if override is None else override
 
         if override.name is None:
-            override.name = cls.__name__
+            override = override.replace(name=cls.__name__)
 
         if override.description is None:
             doc = (cls.default_desc or '').partition('\n\n')[0].replace('\n', ' ')
-            override.description = doc.strip()
+            override = override.replace(description=doc.strip())
 
         return extract_toolmeta(cls.apply, override=override)
 
@@ -71,24 +129,213 @@ class BaseTool(metaclass=ABCMeta):
         first call of ```apply()```, for example loading the model."""
         self._is_setup = True
 
-    def __call__(self, *args: Any, **kwargs) -> Any:
+    def preload(self) -> Future:
+        """Start ``setup()`` in a background thread, so that loading the models
+        overlaps with other work. The calls during loading wait for it instead
+        of loading again.
+
+        Returns:
+            Future: The future of the setup. If ``setup()`` fails, the error is
+            raised by ``result()``, and the next call will retry the setup.
+        """
+        future = Future()
+        if self._is_setup:
+            future.set_result(self)
+            return future
+
+        def _run():
+            future.set_running_or_notify_cancel()
+            try:
+                self._setup_once()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(self)
+
+        threading.Thread(
+            target=_run, name=f'agentlego-preload-{self.name}', daemon=True).start()
+        return future
+
+    def teardown(self):
+        """Release the resources loaded by ``setup()``, and the next call will
+        perform ``setup()`` again.
+
+        By default, the attributes set by ``setup()`` are restored, and the
+        cached objects which were only used by them are dropped from the object
+        cache. Override it to release other resources, and call
+        ``super().teardown()``.
+        """
+        keys = OBJECT_CACHE.keys_of(
+            self.__dict__.get(name) for name in self._setup_state)
+        for name, value in self._setup_state.items():
+            if value is _MISSING:
+                self.__dict__.pop(name, None)
+            else:
+                setattr(self, name, value)
+        self._setup_state = {}
+        self._is_setup = False
+
+        OBJECT_CACHE.release_unused(keys)
+        gc.collect()
+        if 'torch' in sys.modules:
+            import torch
+            if torch.cuda.is_initialized():
+                torch.cuda.empty_cache()
 
-        if not self._is_setup:
+    def _init_lifecycle(self):
+        self._setup_state = {}
+        self._num_active = 0
+        self._last_used = time.monotonic()
+        self._lifecycle_lock = threading.RLock()
+
+    def _setup_once(self):
+        """Setup the tool if it's not setup. The concurrent callers wait for
+        the only setup instead of loading the models again."""
+        with self._lifecycle_lock:
+            if self._is_setup:
+                return
+            before = dict(self.__dict__)
             self.setup()
             self._is_setup = True
+            # Record the attributes set by `setup()` to restore on teardown.
+            self._setup_state = {
+                k: before.get(k, _MISSING)
+                for k, v in self.__dict__.items()
+                if k not in _LIFECYCLE_ATTRS and before.get(k, _MISSING) is not v
+            }
+            self._last_used = time.monotonic()
+            if self.idle_unload_seconds is not None:
+                _IDLE_REAPER.watch(self)
+
+    def _acquire(self):
+        """Setup the tool if necessary and mark it as in use."""
+        with self._lifecycle_lock:
+            if not self._is_setup:
+                self._setup_once()
+            self._num_active += 1
+
+    def _try_acquire(self) -> bool:
+        """Mark the tool as in use if it's setup, without blocking."""
+        if not self._lifecycle_lock.acquire(blocking=False):
+            return False
+        try:
+            if not self._is_setup:
+                return False
+            self._num_active += 1
+            return True
+        finally:
+            self._lifecycle_lock.release()
 
-        inputs, kwinputs = self.parser.parse_inputs(*args, **kwargs)
+    def _release(self):
+        with self._lifecycle_lock:
+            self._num_active -= 1
+            self._last_used = time.monotonic()
+
+    def _unload_if_idle(self) -> bool:
+        """Tear down the tool if it has been idle for ``idle_unload_seconds``."""
+        if not self._lifecycle_lock.acquire(blocking=False):
+            return False
+        try:
+            if (self._is_setup and self._num_active == 0
+                    and self.idle_unload_seconds is not None
+                    and time.monotonic() - self._last_used >= self.idle_unload_seconds):
+                self.teardown()
+                return True
+            return False
+        finally:
+            self._lifecycle_lock.release()
+
+    def __call__(self, *args: Any, **kwargs) -> Any:
 
-        outputs = self.apply(*inputs, **kwinputs)
+        self._acquire()
+        try:
+            inputs, kwinputs = self.parser.parse_inputs(*args, **kwargs)
 
-        results = self.parser.parse_outputs(outputs)
+            outputs = self.apply(*inputs, **kwinputs)
+
+            results = self.parser.parse_outputs(outputs)
+        finally:
+            self._release()
         return results
 
+    async def acall(self, *args: Any, **kwargs) -> Any:
+        """The asynchronous version of calling the tool.
+
+        If the tool implements ``aapply()``, the tool is called natively in the
+        event loop. Otherwise, the whole call runs in a shared thread pool, whose
+        size can be set by the ``AGENTLEGO_MAX_WORKERS`` environment variable.
+        """
+        if type(self).aapply is BaseTool.aapply:
+            return await run_in_executor(self, *args, **kwargs)
+
+        if not self._try_acquire():
+            # Wait for the setup or the teardown out of the event loop.
+            await run_in_executor(self._acquire)
+
+        try:
+            inputs, kwinputs = self.parser.parse_inputs(*args, **kwargs)
+
+            outputs = await self.aapply(*inputs, **kwinputs)
+
+            if any(issubclass(p.type, IOType) for p in self.outputs):
+                # Avoid blocking the event loop by encoding images and audios.
+                results = await run_in_executor(self.parser.parse_outputs, outputs)
+            else:
+                results = self.parser.parse_outputs(outputs)
+        finally:
+            self._release()
+        return results
+
+    def batch(self, inputs: Sequence[Union[dict, tuple, Any]]) -> List[Any]:
+        """Call the tool with a batch of argument sets.
+
+        Args:
+            inputs (Sequence[dict | tuple | Any]): The argument sets. A dict is
+                used as keyword arguments, a tuple is used as positional
+                arguments, and any other value is used as the only positional
+                argument.
+
+        Returns:
+            list: The results of every argument set, in the same order.
+        """
+        self._acquire()
+        try:
+            batch_inputs = []
+            for item in inputs:
+                if isinstance(item, dict):
+                    args, kwargs = (), dict(item)
+                elif isinstance(item, tuple):
+                    args, kwargs = item, {}
+                else:
+                    args, kwargs = (item, ), {}
+                args, kwargs = self.parser.parse_inputs(*args, **kwargs)
+                for arg, p in zip(args, self.inputs):
+                    kwargs[p.name] = arg
+                batch_inputs.append(kwargs)
+
+            outputs = self.apply_batch(batch_inputs)
+
+            return [self.parser.parse_outputs(out) for out in outputs]
+        finally:
+            self._release()
+
     @abstractmethod
     def apply(self, *args, **kwargs) -> Any:
         """Implement the actual function here."""
         raise NotImplementedError
 
+    async def aapply(self, *args, **kwargs) -> Any:
+        """Implement the native asynchronous function here, for example
+        non-blocking network requests. Defaults to run ``apply()`` in the shared
+        thread pool."""
+        return await run_in_executor(self.apply, *args, **kwargs)
+
+    def apply_batch(self, batch_inputs: List[Dict[str, Any]]) -> List[Any]:
+        """Implement the batched function here, for example a batched forward
+        of the model. Every item of ``batch_inputs`` is the keyword arguments
+        of one ``apply()`` call. Defaults to call ``apply()`` one by one."""
+        return [self.apply(**kwargs) for kwargs in batch_inputs]
+
     def __repr__(self) -> str:
         repr_str = (f'{type(self).__name__}('
                     f'toolmeta={self.toolmeta}, '
@@ -98,8 +345,9 @@ class BaseTool(metaclass=ABCMeta):
     def __copy__(self):
         obj = object.__new__(type(self))
         obj.__dict__.update(self.__dict__)
-        obj.toolmeta = copy.deepcopy(self.toolmeta)
         obj.set_parser(self._parser_constructor)
+        obj._init_lifecycle()
+        obj._setup_state = dict(self._setup_state)
         return obj
 
     def to_transformers_agent(self):
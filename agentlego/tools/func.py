@@ -1,4 +1,3 @@
-from copy import deepcopy
 from inspect import cleandoc
 from typing import Callable, Optional, Union
 
@@ -15,9 +14,10 @@ class _FuncTool(BaseTool):
                  toolmeta: ToolMeta,
                  parser: Callable = DefaultParser):
         self.func = func
-        self.toolmeta = deepcopy(toolmeta)
+        self.toolmeta = toolmeta
         self.set_parser(parser)
         self._is_setup = True
+        self._init_lifecycle()
 
     def apply(self, *args, **kwargs):
         return self.func(*args, **kwargs)
@@ -38,19 +38,13 @@ class _FuncToolType:
         if override is None:
             return self.toolmeta
 
-        override = deepcopy(override)
         override = ToolMeta(**override) if isinstance(override, dict) else override
-
-        if override.name is None:
-            override.name = self.toolmeta.name
-        if override.description is None:
-            override.description = self.toolmeta.description
-        if override.inputs is None:
-            override.inputs = self.toolmeta.inputs
-        if override.outputs is None:
-            override.outputs = self.toolmeta.outputs
-
-        return override
+        changes = {
+            k: getattr(override, k)
+            for k in ('name', 'description', 'inputs', 'outputs')
+            if getattr(override, k) is not None
+        }
+        return self.toolmeta.replace(**changes)
 
 
 def make_tool(func: Optional[Callable] = None,
@@ -90,11 +84,12 @@ def make_tool(func: Optional[Callable] = None,
         if infer_meta:
             toolmeta = extract_toolmeta(func, override)
             if toolmeta.name is None:
-                toolmeta.name = func.__name__
+                toolmeta = toolmeta.replace(name=func.__name__)
             if toolmeta.description is None and func.__doc__:
-                toolmeta.description = cleandoc(func.__doc__).partition('\n\n')[0]
+                toolmeta = toolmeta.replace(
+                    description=cleandoc(func.__doc__).partition('\n\n')[0])
         else:
-            toolmeta = deepcopy(override)
+            toolmeta = override
         tool = _FuncToolType(func, toolmeta=toolmeta)
         return tool
 
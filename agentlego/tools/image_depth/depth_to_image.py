@@ -1,7 +1,7 @@
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import require
 from ..base import BaseTool
-from ..utils.diffusers import load_sd, load_sdxl
+from ..utils.diffusers import load_diffusion_engine
 
 
 class DepthTextToImage(BaseTool):
@@ -26,17 +26,16 @@ class DepthTextToImage(BaseTool):
         self.device = device
 
     def setup(self):
+        self.engine = load_diffusion_engine(self.model, device=self.device)
         if self.model == 'sdxl':
-            self.pipe = load_sdxl(
+            self.controlnet = dict(
                 controlnet='diffusers/controlnet-depth-sdxl-1.0',
                 controlnet_variant='fp16',
-                device=self.device,
             )
         elif self.model == 'sd':
-            self.pipe = load_sd(
-                controlnet='lllyasviel/sd-controlnet-depth',
-                device=self.device,
-            )
+            self.controlnet = dict(controlnet='lllyasviel/sd-controlnet-depth')
+        # Keep the ControlNet loaded until the tool is torn down.
+        self.pipe = self.engine.pipeline(**self.controlnet)
         self.a_prompt = 'best quality, extremely detailed'
         self.n_prompt = 'longbody, lowres, bad anatomy, bad hands, '\
                         ' missing fingers, extra digit, fewer digits, '\
@@ -49,11 +48,12 @@ class DepthTextToImage(BaseTool):
                             Info('A series of English keywords separated by comma.')],
     ) -> ImageIO:
         prompt = f'{keywords}, {self.a_prompt}'
-        image = self.pipe(
+        image = self.engine(
             prompt,
             image=image.to_pil(),
             num_inference_steps=20,
             negative_prompt=self.n_prompt,
             controlnet_conditioning_scale=0.5,
+            **self.controlnet,
         ).images[0]
         return ImageIO(image)
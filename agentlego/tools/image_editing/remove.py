@@ -4,6 +4,7 @@ from PIL import Image
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import load_or_build_object, require
 from ..base import BaseTool
+from ..utils.mask import dilate_mask
 
 GLOBAL_SEED = 1912
 
@@ -69,8 +70,7 @@ class ObjectRemove(BaseTool):
 
         boxes_filt = results.bboxes
 
-        self.sam_predictor.set_image(image.to_array())
-        masks = self.get_mask_with_boxes(image_pil, image, boxes_filt)
+        masks = self.get_mask_with_boxes(image_pil, image.to_array(), boxes_filt)
         mask = torch.sum(masks, dim=0).unsqueeze(0)
         mask = torch.where(mask > 0, True, False)
         mask = mask.squeeze(0).squeeze(0).cpu()
@@ -83,13 +83,7 @@ class ObjectRemove(BaseTool):
         return ImageIO(output_image)
 
     def pad_edge(self, mask, padding):
-        mask = mask.numpy()
-        true_indices = np.argwhere(mask)
-        mask_array = np.zeros_like(mask, dtype=bool)
-        for idx in true_indices:
-            padded_slice = tuple(
-                slice(max(0, i - padding), i + padding + 1) for i in idx)
-            mask_array[padded_slice] = True
+        mask_array = dilate_mask(mask.numpy(), padding)
         new_mask = (mask_array * 255).astype(np.uint8)
         return new_mask
 
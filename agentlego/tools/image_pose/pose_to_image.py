@@ -5,7 +5,7 @@ from PIL import Image
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import require
 from ..base import BaseTool
-from ..utils.diffusers import load_sd, load_sdxl
+from ..utils.diffusers import load_diffusion_engine
 
 
 class PoseToImage(BaseTool):
@@ -30,18 +30,15 @@ class PoseToImage(BaseTool):
         self.device = device
 
     def setup(self):
+        self.engine = load_diffusion_engine(self.model, device=self.device)
         if self.model == 'sdxl':
-            self.pipe = load_sdxl(
-                controlnet='thibaud/controlnet-openpose-sdxl-1.0',
-                device=self.device,
-            )
+            self.controlnet = dict(controlnet='thibaud/controlnet-openpose-sdxl-1.0')
             self.canvas_size = 1024
         elif self.model == 'sd':
-            self.pipe = load_sd(
-                controlnet='lllyasviel/sd-controlnet-openpose',
-                device=self.device,
-            )
+            self.controlnet = dict(controlnet='lllyasviel/sd-controlnet-openpose')
             self.canvas_size = 512
+        # Keep the ControlNet loaded until the tool is torn down.
+        self.pipe = self.engine.pipeline(**self.controlnet)
         self.a_prompt = 'best quality, extremely detailed'
         self.n_prompt = 'longbody, lowres, bad anatomy, bad hands, '\
                         ' missing fingers, extra digit, fewer digits, '\
@@ -55,12 +52,13 @@ class PoseToImage(BaseTool):
     ) -> ImageIO:
         text = f'{keywords}, {self.a_prompt}'
         width, height = self.get_image_size(image.to_pil(), canvas_size=self.canvas_size)
-        image = self.pipe(
+        image = self.engine(
             text,
             image=image.to_pil(),
             negative_prompt=self.n_prompt,
             width=width,
             height=height,
+            **self.controlnet,
         ).images[0]
         return ImageIO(image)
 
@@ -1,16 +1,13 @@
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import require
 from ..base import BaseTool
-from ..utils.diffusers import load_sd
+from ..utils.diffusers import load_diffusion_engine
 
 
 class ScribbleTextToImage(BaseTool):
     """A tool to generate image according to a scribble sketch.
 
     Args:
-        model (str): The model name used to inference. Which can be found
-            in the ``diffusers`` repository.
-            Defaults to 'lllyasviel/sd-controlnet_scribble'.
         model (str): The scribble controlnet model to use. You can only choose
             "sd" by now. Defaults to "sd".
         device (str): The device to load the model. Defaults to 'cuda'.
@@ -25,15 +22,15 @@ class ScribbleTextToImage(BaseTool):
     def __init__(self, model: str = 'sd', device: str = 'cuda', toolmeta=None):
         super().__init__(toolmeta=toolmeta)
         assert model in ['sd']
-        self.model_name = model
+        self.model = model
         self.device = device
 
     def setup(self):
+        self.engine = load_diffusion_engine(self.model, device=self.device)
         if self.model == 'sd':
-            self.pipe = load_sd(
-                controlnet='lllyasviel/sd-controlnet-scribble',
-                device=self.device,
-            )
+            self.controlnet = dict(controlnet='lllyasviel/sd-controlnet-scribble')
+        # Keep the ControlNet loaded until the tool is torn down.
+        self.pipe = self.engine.pipeline(**self.controlnet)
         self.a_prompt = 'best quality, extremely detailed, 4k, master piece'
         self.n_prompt = 'longbody, lowres, bad anatomy, bad hands, '\
                         ' missing fingers, extra digit, fewer digits, '\
@@ -46,12 +43,13 @@ class ScribbleTextToImage(BaseTool):
                             Info('A series of English keywords separated by comma.')],
     ) -> ImageIO:
         prompt = f'{keywords}, {self.a_prompt}'
-        image = self.pipe(
+        image = self.engine(
             prompt,
             image.to_pil(),
             num_inference_steps=20,
             eta=0.0,
             negative_prompt=self.n_prompt,
             guidance_scale=9.0,
+            **self.controlnet,
         ).images[0]
         return ImageIO(image)
@@ -1,3 +1,5 @@
+from typing import List
+
 from agentlego.types import ImageIO
 from agentlego.utils import load_or_build_object, require
 from ..base import BaseTool
@@ -40,3 +42,8 @@ class ImageDescription(BaseTool):
     def apply(self, image: ImageIO) -> str:
         image = image.to_array()[:, :, ::-1]
         return self._inferencer(image)[0]['pred_caption']
+
+    def apply_batch(self, batch_inputs: List[dict]) -> List[str]:
+        images = [inputs['image'].to_array()[:, :, ::-1] for inputs in batch_inputs]
+        results = self._inferencer(images, batch_size=len(images))
+        return [item['pred_caption'] for item in results]
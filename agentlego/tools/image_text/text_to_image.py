@@ -1,7 +1,7 @@
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import require
 from ..base import BaseTool
-from ..utils.diffusers import load_sd, load_sdxl
+from ..utils.diffusers import load_diffusion_engine
 
 
 class TextToImage(BaseTool):
@@ -26,10 +26,7 @@ class TextToImage(BaseTool):
         self.device = device
 
     def setup(self):
-        if self.model == 'sdxl':
-            self.pipe = load_sdxl(device=self.device)
-        elif self.model == 'sd':
-            self.pipe = load_sd(device=self.device)
+        self.engine = load_diffusion_engine(self.model, device=self.device)
         self.a_prompt = 'best quality, extremely detailed'
         self.n_prompt = 'longbody, lowres, bad anatomy, bad hands, '\
                         ' missing fingers, extra digit, fewer digits, '\
@@ -41,7 +38,7 @@ class TextToImage(BaseTool):
                             Info('A series of English keywords separated by comma.')],
     ) -> ImageIO:
         prompt = f'{keywords}, {self.a_prompt}'
-        image = self.pipe(
+        image = self.engine(
             prompt,
             num_inference_steps=30,
             negative_prompt=self.n_prompt,
@@ -1,3 +1,5 @@
+from typing import List
+
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import load_or_build_object, require
 from ..base import BaseTool
@@ -39,13 +41,24 @@ class ObjectDetection(BaseTool):
                    Info('All detected objects, include object name, '
                         'bbox in (x1, y1, x2, y2) format, '
                         'and detection score.')]:
-        from mmdet.structures import DetDataSample
-
         results = self._inferencer(
             image.to_array()[:, :, ::-1],
             return_datasamples=True,
         )
-        data_sample = results['predictions'][0]
+        return self._format_predictions(results['predictions'][0])
+
+    def apply_batch(self, batch_inputs: List[dict]) -> List[str]:
+        images = [inputs['image'].to_array()[:, :, ::-1] for inputs in batch_inputs]
+        results = self._inferencer(
+            images,
+            batch_size=len(images),
+            return_datasamples=True,
+        )
+        return [self._format_predictions(item) for item in results['predictions']]
+
+    def _format_predictions(self, data_sample) -> str:
+        from mmdet.structures import DetDataSample
+
         preds: DetDataSample = data_sample.pred_instances
         preds = preds[preds.scores > 0.5]
         pred_descs = []
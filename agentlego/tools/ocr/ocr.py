@@ -1,4 +1,5 @@
-from typing import Sequence, Tuple, Union
+from collections import defaultdict
+from typing import List, Sequence, Tuple, Union
 
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import load_or_build_object, require
@@ -58,6 +59,26 @@ class OCR(BaseTool):
 
         image = image.to_array()
         results = self._reader.readtext(image, detail=1, **self.read_args)
+        return self._format_results(results)
+
+    def apply_batch(self, batch_inputs: List[dict]) -> List[str]:
+        images = [inputs['image'].to_array() for inputs in batch_inputs]
+
+        # The detector of EasyOCR can only batch images with the same shape.
+        groups = defaultdict(list)
+        for i, image in enumerate(images):
+            groups[image.shape].append(i)
+
+        outputs = [None] * len(images)
+        for indices in groups.values():
+            results = self._reader.readtext_batched([images[i] for i in indices],
+                                                    detail=1,
+                                                    **self.read_args)
+            for i, result in zip(indices, results):
+                outputs[i] = self._format_results(result)
+        return outputs
+
+    def _format_results(self, results) -> str:
         results = [(self.extract_bbox(item[0]), item[1]) for item in results]
 
         if self.line_group_tolerance >= 0:
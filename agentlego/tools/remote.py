@@ -1,17 +1,94 @@
+import asyncio
 import base64
+import functools
+import json
+import weakref
+from collections import defaultdict
 from io import BytesIO, IOBase
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urljoin, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from agentlego.parsers import DefaultParser
 from agentlego.schema import Parameter
 from agentlego.tools.base import BaseTool
 from agentlego.types import AudioIO, File, ImageIO
+from agentlego.utils import is_package_available, run_in_executor
+from agentlego.utils.blobs import (BLOB_DIGESTS_HEADER, BLOB_REF_MEDIA_TYPE, BlobIndex,
+                                   blob_digest)
+from agentlego.utils.multipart import decode_multipart
 from agentlego.utils.openapi import (APIOperation, APIResponseProperty, OpenAPISpec,
                                      operation_toolmeta)
 
+# The blobs stored by every server, shared by all remote tools of the server.
+_SERVER_BLOBS: Dict[str, BlobIndex] = defaultdict(BlobIndex)
+
+# The (connect, read) timeout seconds of the requests.
+DEFAULT_TIMEOUT = (10, 600)
+
+# The aiohttp sessions of every event loop.
+_AIOHTTP_SESSIONS = weakref.WeakKeyDictionary()
+
+
+def create_session(pool_size: int = 10,
+                   max_retries: int = 3,
+                   backoff_factor: float = 0.5) -> requests.Session:
+    """Create a HTTP session with a connection pool and a retry policy.
+
+    The connection failures are always retried, and the read failures and the
+    ``502``, ``503`` and ``504`` responses are only retried for idempotent
+    methods, since the tool calls by ``POST`` may be not safe to repeat.
+
+    Args:
+        pool_size (int): The maximum number of connections to keep alive for
+            every host. Defaults to 10.
+        max_retries (int): The maximum number of retries. Defaults to 3.
+        backoff_factor (float): The sleep seconds between retries are
+            ``backoff_factor * 2 ** (n - 1)``. Defaults to 0.5.
+
+    Returns:
+        requests.Session: The session.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+async def _keep_aiohttp_session(session):
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_aiohttp_session():
+    """Get the aiohttp session shared by all remote tools in the running event
+    loop, and the session will be closed with the event loop."""
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    if loop not in _AIOHTTP_SESSIONS:
+        for closed_loop in [k for k in _AIOHTTP_SESSIONS if k.is_closed()]:
+            del _AIOHTTP_SESSIONS[closed_loop]
+        # The async generator is closed by the event loop during shutdown,
+        # like at the end of `asyncio.run`, which closes the session.
+        keeper = _keep_aiohttp_session(aiohttp.ClientSession())
+        _AIOHTTP_SESSIONS[loop] = (await keeper.__anext__(), keeper)
+    return _AIOHTTP_SESSIONS[loop][0]
+
 
 class RemoteTool(BaseTool):
     """Create a tool from an OpenAPI Specification (OAS).
@@ -43,6 +120,22 @@ class RemoteTool(BaseTool):
 
     Notice:
         The ``RemoteTool`` works well with the ``agentlego-server``.
+
+    Args:
+        operation (APIOperation): The API operation of the tool.
+        headers (dict | None): The headers to send in the requests.
+            Defaults to None.
+        auth (tuple | None): Auth tuple to enable Basic/Digest/Custom HTTP Auth.
+            Defaults to None.
+        toolkit (str | None): The name of the toolkit. Defaults to None.
+        binary_response (bool): Whether to receive images, audios and files as
+            raw bytes in a ``multipart/mixed`` response instead of base64 in JSON,
+            if the server supports. Defaults to True.
+        session (requests.Session | None): The HTTP session to send requests,
+            which can be shared by multiple tools to reuse connections.
+            Defaults to None, which means to create by :func:`create_session`.
+        timeout (float | tuple): The seconds to wait for the server, or a
+            ``(connect, read)`` tuple. Defaults to ``(10, 600)``.
     """  # noqa: E501
 
     def __init__(
@@ -51,16 +144,28 @@ class RemoteTool(BaseTool):
         headers: Optional[dict] = None,
         auth: Optional[tuple] = None,
         toolkit: Optional[str] = None,
+        binary_response: bool = True,
+        session: Optional[requests.Session] = None,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
     ):
         self.operation = operation
         self.url = urljoin(operation.base_url, operation.path)
-        self.headers = headers
+        self.headers = dict(headers or {})
         self.auth = auth
+        self.session = session or create_session()
+        self.timeout = timeout
         self.method = operation.method.name
         self.toolmeta = operation_toolmeta(operation)
         self.toolkit = toolkit
         self.set_parser(DefaultParser)
         self._is_setup = False
+        self._init_lifecycle()
+        self._blobs = _SERVER_BLOBS[operation.base_url]
+
+        response_schema = (operation.responses or {}).get('200')
+        if (binary_response and response_schema is not None
+                and 'multipart/mixed' in response_schema.other_media_types):
+            self.headers.setdefault('Accept', 'multipart/mixed, application/json;q=0.9')
 
     def _construct_path(self, kwargs: Dict[str, str]) -> str:
         """Construct url according to path parameters from inputs."""
@@ -77,7 +182,18 @@ class RemoteTool(BaseTool):
                 query_params[param] = kwargs.pop(param)
         return query_params
 
-    def _construct_body(self, kwargs: Dict[str, str]) -> Dict[str, Any]:
+    def _construct_file(self, name: str, file: IOBase, blob_refs: bool) -> tuple:
+        """Construct a file part, which refers to the blob by digest if the
+        server has stored the same content."""
+        with file:
+            data = file.read()
+        digest = blob_digest(data)
+        if blob_refs and digest in self._blobs:
+            return (name, digest.encode(), BLOB_REF_MEDIA_TYPE)
+        return (name, data)
+
+    def _construct_body(self, kwargs: Dict[str, str],
+                        blob_refs: bool = True) -> Dict[str, Any]:
         """Construct request body parameters from inputs."""
         if not self.operation.request_body or not self.operation.body_params:
             return {}
@@ -93,11 +209,13 @@ class RemoteTool(BaseTool):
                 body[param] = value
 
         if media_type == 'multipart/form-data':
-            body = {
-                k: (k, v) if isinstance(v, IOBase) else (None, v)
-                for k, v in body.items()
-            }
-            return {'files': body}
+            files = {}
+            for k, v in body.items():
+                if isinstance(v, IOBase):
+                    files[k] = self._construct_file(k, v, blob_refs)
+                else:
+                    files[k] = (None, v)
+            return {'files': files}
         elif media_type == 'application/json':
             return {'json': body}
         elif media_type == 'application/x-www-form-urlencoded':
@@ -107,59 +225,84 @@ class RemoteTool(BaseTool):
 
     @staticmethod
     def _parse_output(out: Any, p: Parameter):
+        if p.type in (ImageIO, AudioIO, File) and not isinstance(out, bytes):
+            # The binary outputs are encoded by base64 in JSON response.
+            out = base64.b64decode(out)
+
         if p.type is ImageIO:
-            file = BytesIO(base64.b64decode(out))
-            out = ImageIO.from_file(file)
+            out = ImageIO.from_file(BytesIO(out))
         elif p.type is AudioIO:
-            file = BytesIO(base64.b64decode(out))
-            out = AudioIO.from_file(file)
+            out = AudioIO.from_file(BytesIO(out))
         elif p.type is File:
-            file = BytesIO(base64.b64decode(out))
-            out = File.from_file(file, filetype=p.filetype)
+            out = File.from_file(BytesIO(out), filetype=p.filetype)
         return out
 
-    def apply(self, *args, **kwargs):
+    def _construct_request(self, *args, blob_refs: bool = True,
+                           **kwargs) -> Dict[str, Any]:
+        """Construct the arguments of ``requests.request`` from inputs."""
         for arg, p in zip(args, self.inputs):
             kwargs[p.name] = arg
 
-        request_args = {
+        return {
             'url': self._construct_path(kwargs),
             'params': self._construct_query(kwargs),
-            **self._construct_body(kwargs)
+            **self._construct_body(kwargs, blob_refs=blob_refs)
         }
 
-        try:
-            response = requests.request(
-                method=self.method,
-                **request_args,
-                headers=self.headers,
-                auth=self.auth,
-            )
-        except requests.ConnectionError as e:
-            raise ConnectionError(
-                f'Failed to connect the remote tool `{self.name}`.') from e
-        if response.status_code != 200:
-            if response.headers.get('Content-Type') == 'application/json':
-                content = response.json()
+    @staticmethod
+    def _blob_refs(request_args: Dict[str, Any]) -> List[str]:
+        """Get the digests of the blobs referred in the request."""
+        return [
+            part[1].decode() for part in request_args.get('files', {}).values()
+            if len(part) == 3 and part[2] == BLOB_REF_MEDIA_TYPE
+        ]
+
+    def _update_blobs(self, request_args: Dict[str, Any], status_code: int,
+                      header: Optional[str]) -> bool:
+        """Update the known blobs of the server from the response, and return
+        whether to upload the content of the referred blobs again."""
+        if header:
+            self._blobs.add(header.split(','))
+        if status_code == 409 and self._blob_refs(request_args):
+            # The server has evicted the referred blobs.
+            self._blobs.discard(self._blob_refs(request_args))
+            return True
+        return False
+
+    def _parse_response(self, status_code: int, reason: str, content_type: str,
+                        content: bytes):
+        """Parse the outputs from the response of the remote tool."""
+        if status_code != 200:
+            if content_type == 'application/json':
+                content = json.loads(content)
             else:
-                content = response.content.decode()
+                content = content.decode()
             raise RuntimeError(f'Failed to call the remote tool `{self.name}` '
-                               f'because of {response.reason}.\nResponse: {content}')
+                               f'because of {reason}.\nResponse: {content}')
 
         response_schema = self.operation.responses
         if response_schema is None or response_schema.get('200') is None:
             # Directly use string if the response schema is not specified
-            return response.text
-
-        try:
-            response = response.json()
-        except requests.JSONDecodeError as e:
-            raise RuntimeError(f'Failed to call the remote tool `{self.name}` '
-                               'because of unknown response.\n'
-                               f'Response: {response.content.decode()}') from e
+            return content.decode()
 
         out_props = response_schema['200'].properties
 
+        if content_type and content_type.startswith('multipart/mixed'):
+            # Every output is a part, and the binary outputs are raw bytes.
+            response = [
+                json.loads(data) if headers.get('content-type') == 'application/json'
+                else data for headers, data in decode_multipart(content, content_type)
+            ]
+            if isinstance(out_props, APIResponseProperty):
+                response = response[0]
+        else:
+            try:
+                response = json.loads(content)
+            except ValueError as e:
+                raise RuntimeError(f'Failed to call the remote tool `{self.name}` '
+                                   'because of unknown response.\n'
+                                   f'Response: {content.decode()}') from e
+
         if isinstance(out_props, APIResponseProperty):
             # Single output
             return self._parse_output(response, self.outputs[0])
@@ -174,6 +317,127 @@ class RemoteTool(BaseTool):
                 for out, p in zip(response, self.outputs)
             }
 
+    def apply(self, *args, **kwargs):
+        blob_refs = True
+        while True:
+            request_args = self._construct_request(
+                *args, blob_refs=blob_refs, **kwargs)
+
+            try:
+                response = self.session.request(
+                    method=self.method,
+                    **request_args,
+                    headers=self.headers,
+                    auth=self.auth,
+                    timeout=self.timeout,
+                )
+            except requests.ConnectionError as e:
+                raise ConnectionError(
+                    f'Failed to connect the remote tool `{self.name}`.') from e
+            except requests.Timeout as e:
+                raise TimeoutError(
+                    f'Timeout to wait for the remote tool `{self.name}`.') from e
+
+            reupload = self._update_blobs(request_args, response.status_code,
+                                          response.headers.get(BLOB_DIGESTS_HEADER))
+            if not (reupload and blob_refs):
+                break
+            blob_refs = False
+
+        return self._parse_response(
+            status_code=response.status_code,
+            reason=response.reason,
+            content_type=response.headers.get('Content-Type'),
+            content=response.content,
+        )
+
+    async def aapply(self, *args, **kwargs):
+        if not is_package_available('aiohttp') or not (self.auth is None
+                                                       or isinstance(self.auth, tuple)):
+            # Fallback to the thread pool for custom authentication classes.
+            return await super().aapply(*args, **kwargs)
+
+        import aiohttp
+
+        blob_refs = True
+        while True:
+            # Encoding images and audios blocks, construct out of the event loop.
+            request_args = await run_in_executor(
+                functools.partial(
+                    self._construct_request, *args, blob_refs=blob_refs, **kwargs))
+
+            try:
+                response, content = await self._asend(request_args)
+            except aiohttp.ClientConnectionError as e:
+                raise ConnectionError(
+                    f'Failed to connect the remote tool `{self.name}`.') from e
+            except asyncio.TimeoutError as e:
+                raise TimeoutError(
+                    f'Timeout to wait for the remote tool `{self.name}`.') from e
+
+            reupload = self._update_blobs(request_args, response.status,
+                                          response.headers.get(BLOB_DIGESTS_HEADER))
+            if not (reupload and blob_refs):
+                break
+            blob_refs = False
+
+        return self._parse_response(
+            status_code=response.status,
+            reason=response.reason,
+            content_type=response.headers.get('Content-Type'),
+            content=content,
+        )
+
+    async def _asend(self, request_args: Dict[str, Any]):
+        """Send the request by aiohttp with the same timeout and the same retry
+        policy on connection failures as the requests session."""
+        import aiohttp
+
+        session = await get_aiohttp_session()
+        auth = aiohttp.BasicAuth(*self.auth) if self.auth is not None else None
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+        else:
+            connect = read = self.timeout
+        timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+        retry = self.session.get_adapter(self.url).max_retries
+        max_retries = retry.connect if retry.connect is not None else (retry.total or 0)
+
+        for i in range(max_retries + 1):
+            send_args = dict(request_args)
+            if 'files' in send_args:
+                # The form data cannot be sent twice, create for every attempt.
+                form = aiohttp.FormData()
+                for k, (filename, v, *content_type) in send_args.pop('files').items():
+                    if filename is not None:
+                        form.add_field(
+                            k,
+                            v,
+                            filename=filename,
+                            content_type=content_type[0] if content_type else None)
+                    elif v is not None:
+                        form.add_field(k, str(v))
+                send_args['data'] = form
+            send_args['params'] = {
+                k: str(v)
+                for k, v in send_args['params'].items() if v is not None
+            }
+
+            try:
+                async with session.request(
+                        method=self.method,
+                        **send_args,
+                        headers=self.headers,
+                        auth=auth,
+                        timeout=timeout,
+                ) as response:
+                    return response, await response.read()
+            except aiohttp.ClientConnectorError:
+                if i == max_retries:
+                    raise
+                await asyncio.sleep(retry.backoff_factor * 2**i)
+
     @classmethod
     def from_server(cls, url: str, **kwargs) -> List['RemoteTool']:
         return cls.from_openapi(url=urljoin(url, '/openapi.json'), **kwargs)
@@ -194,9 +458,17 @@ class RemoteTool(BaseTool):
             headers (str | None): The headers to send in the requests. Defaults to None.
             auth (tuple | None): Auth tuple to enable Basic/Digest/Custom HTTP Auth.
                 Defaults to None.
+            session (requests.Session | None): The HTTP session shared by all the
+                tools. Defaults to None, which means to create by
+                :func:`create_session`.
+            timeout (float | tuple): The seconds to wait for the server, or a
+                ``(connect, read)`` tuple. Defaults to ``(10, 600)``.
         """
+        # Reuse the connections to the server among all tools.
+        session = kwargs.pop('session', None) or create_session()
+
         if url is not None and url.startswith('http'):
-            spec = OpenAPISpec.from_url(url)
+            spec = OpenAPISpec.from_url(url, session=session)
         elif url is not None:
             spec = OpenAPISpec.from_file(url)
         elif text is not None:
@@ -213,6 +485,7 @@ class RemoteTool(BaseTool):
             tool = cls(
                 operation=operation,
                 toolkit=toolkit,
+                session=session,
                 **kwargs,
             )
             tools.append(tool)
@@ -237,13 +510,19 @@ class RemoteTool(BaseTool):
             headers (str | None): The headers to send in the requests. Defaults to None.
             auth (tuple | None): Auth tuple to enable Basic/Digest/Custom HTTP Auth.
                 Defaults to None.
+            session (requests.Session | None): The HTTP session to send requests.
+                Defaults to None, which means to create by :func:`create_session`.
+            timeout (float | tuple): The seconds to wait for the server, or a
+                ``(connect, read)`` tuple. Defaults to ``(10, 600)``.
         """
         # The default openapi file for the tool server.
         openapi = openapi or urljoin(url, '/openapi.json')
         path = path or urlsplit(url).path
+        kwargs['session'] = kwargs.get('session') or create_session()
 
         if openapi.startswith('http'):
-            spec = OpenAPISpec.from_url(openapi)
+            # The spec is cached and only revalidated for the other tools.
+            spec = OpenAPISpec.from_url(openapi, session=kwargs['session'])
         else:
             spec = OpenAPISpec.from_file(openapi)
 
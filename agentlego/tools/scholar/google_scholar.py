@@ -2,10 +2,28 @@ import os
 from typing import Optional
 
 from agentlego.types import Annotated, Info
-from agentlego.utils import require
+from agentlego.utils import is_package_available, require
 from ..base import BaseTool
 
 
+def serpapi_search(params: dict) -> dict:
+    from serpapi import GoogleSearch
+    search = GoogleSearch(params)
+    return search.get_dict()
+
+
+async def serpapi_asearch(params: dict, timeout: int) -> dict:
+    """The non-blocking version of :func:`serpapi_search`."""
+    import aiohttp
+
+    params = {k: str(v) for k, v in params.items() if v is not None}
+    params.update(source='python', output='json')
+    timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get('https://serpapi.com/search', params=params) as response:
+            return await response.json(content_type=None)
+
+
 class GoogleScholarArticle(BaseTool):
     default_desc = ('Search for scholarly articles based on'
                     ' a query according to the google scholar.')
@@ -32,8 +50,17 @@ class GoogleScholarArticle(BaseTool):
     ) -> Annotated[str,
                    Info('Article information, include title, '
                         'organic id, publication and snippets')]:
-        from serpapi import GoogleSearch
-        params = dict(
+        params = self._params(query, as_ylo, as_yhi, num)
+        return self._parse_results(serpapi_search(params), num)
+
+    async def aapply(self, query, as_ylo=None, as_yhi=None, num=3) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(query, as_ylo, as_yhi, num)
+        params = self._params(query, as_ylo, as_yhi, num)
+        return self._parse_results(await serpapi_asearch(params, self.timeout), num)
+
+    def _params(self, query, as_ylo, as_yhi, num) -> dict:
+        return dict(
             q=query,
             engine='google_scholar',
             api_key=self.api_key,
@@ -41,8 +68,9 @@ class GoogleScholarArticle(BaseTool):
             as_yhi=as_yhi,
             num=num,
         )
-        search = GoogleSearch(params)
-        results = search.get_dict()['organic_results'][:num]
+
+    def _parse_results(self, results: dict, num: int) -> str:
+        results = results['organic_results'][:num]
         docs = []
         for item in results:
             citation = item.get('inline_links', {}).get('cited_by', {}).get('total', '')
@@ -70,14 +98,22 @@ class GoogleScholarAuthorInfo(BaseTool):
         self.timeout = timeout
 
     def apply(self, author_id: Annotated[str, Info('ID of the author')]) -> str:
-        from serpapi import GoogleSearch
-        params = dict(
+        return self._parse_results(serpapi_search(self._params(author_id)))
+
+    async def aapply(self, author_id: str) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(author_id)
+        results = await serpapi_asearch(self._params(author_id), self.timeout)
+        return self._parse_results(results)
+
+    def _params(self, author_id: str) -> dict:
+        return dict(
             engine='google_scholar_author',
             api_key=self.api_key,
             author_id=author_id,
         )
-        search = GoogleSearch(params)
-        results = search.get_dict()
+
+    def _parse_results(self, results: dict) -> str:
         author = results.get('author')
         if not author:
             return 'No author is found, please check your author id.'
@@ -115,14 +151,22 @@ class GoogleScholarAuthorId(BaseTool):
         self, query: Annotated[str,
                                Info('Author name or other related information')]
     ) -> Annotated[str, Info('The author id of the author')]:
-        from serpapi import GoogleSearch
-        params = dict(
+        return self._parse_results(serpapi_search(self._params(query)))
+
+    async def aapply(self, query: str) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(query)
+        results = await serpapi_asearch(self._params(query), self.timeout)
+        return self._parse_results(results)
+
+    def _params(self, query: str) -> dict:
+        return dict(
             mauthors=query,
             engine='google_scholar_profiles',
             api_key=self.api_key,
         )
-        search = GoogleSearch(params)
-        results = search.get_dict()
+
+    def _parse_results(self, results: dict) -> str:
         profile = results.get('profiles', [])
         if not profile:
             return 'No author is found.'
@@ -145,14 +189,22 @@ class GoogleScholarCitation(BaseTool):
 
     def apply(self, organic_id: Annotated[str,
                                           Info('The organic id of an article')]) -> str:
-        from serpapi import GoogleSearch
-        params = dict(
+        return self._parse_results(serpapi_search(self._params(organic_id)))
+
+    async def aapply(self, organic_id: str) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(organic_id)
+        results = await serpapi_asearch(self._params(organic_id), self.timeout)
+        return self._parse_results(results)
+
+    def _params(self, organic_id: str) -> dict:
+        return dict(
             q=organic_id,
             engine='google_scholar_cite',
             api_key=self.api_key,
         )
-        search = GoogleSearch(params)
-        results = search.get_dict()
+
+    def _parse_results(self, results: dict) -> str:
         citations = results['citations']
         docs = []
         for citation in citations:
@@ -1,3 +1,4 @@
+import asyncio
 import heapq
 import os
 import re
@@ -7,7 +8,7 @@ from urllib import parse
 import requests
 
 from agentlego.types import Annotated, Info
-from agentlego.utils import require
+from agentlego.utils import is_package_available, require, run_in_executor
 from ..base import BaseTool
 from ..utils.nlp import score_fasttext, score_naive, top_sentence
 
@@ -27,7 +28,10 @@ def extract_snippet(query, url, ft, nlp, lang: str = 'en') -> Optional[str]:
     if response is None:
         return None
     response.encoding = 'utf-8'
+    return extract_snippet_from_html(query, response.text, ft, nlp, lang)
 
+
+def extract_snippet_from_html(query, html, ft, nlp, lang: str = 'en') -> Optional[str]:
     if lang == 'en':
         keywords = re.findall(r'\w+', query, re.ASCII)
     else:
@@ -38,7 +42,7 @@ def extract_snippet(query, url, ft, nlp, lang: str = 'en') -> Optional[str]:
 
     # try to extract from page description
     from bs4 import BeautifulSoup
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(html, 'html.parser')
     description = extract_description(soup)
     if description:
         if all(key_word in description for key_word in keywords):
@@ -140,16 +144,89 @@ class BingSearch(BaseTool):
         response.raise_for_status()
         return response.json()
 
+    async def bing_search_aapi(self, session, query: str):
+        """The non-blocking version of :meth:`bing_search_api`."""
+        endpoint = 'https://api.bing.microsoft.com/v7.0/search'
+        params = {'q': query, 'mkt': 'zh-CN', 'count': '20'}
+        headers = {'Ocp-Apim-Subscription-Key': self.sub_key}
+
+        async with session.get(endpoint, headers=headers, params=params) as response:
+            response.raise_for_status()
+            return await response.json()
+
     def apply(self,
               query: str,
               topk: Annotated[int, Info('The maximum number of results')] = 3) -> str:
+        lang = self._classify_language(query)
+        response = self.bing_search_api(query)
+        urls, snippets, titles = self._parse_response(response, topk)
+
+        docs = []
+        for url, snippet, title in zip(urls, snippets, titles):
+            try:
+                ft = self.ft_zh if lang == 'zh' else self.ft_en
+                nlp = self.nlp_zh if lang == 'zh' else self.nlp_en
+                snippet = extract_snippet(
+                    query, url, ft=ft, nlp=nlp, lang=lang) or snippet
+            except Exception:
+                pass
+            summary = f'Title: {title}\nURL: {url}\n{snippet}'
+            docs.append(summary)
+
+        return '\n\n'.join(docs)
+
+    async def aapply(self, query: str, topk: int = 3) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(query, topk)
+        import aiohttp
+
+        lang = self._classify_language(query)
+        async with aiohttp.ClientSession() as session:
+            response = await self.bing_search_aapi(session, query)
+            urls, snippets, titles = self._parse_response(response, topk)
+            # Fetch all webpages concurrently.
+            htmls = await asyncio.gather(
+                *(self._fetch_webpage(session, url) for url in urls),
+                return_exceptions=True)
+
+        docs = []
+        for url, snippet, title, html in zip(urls, snippets, titles, htmls):
+            if isinstance(html, str):
+                try:
+                    ft = self.ft_zh if lang == 'zh' else self.ft_en
+                    nlp = self.nlp_zh if lang == 'zh' else self.nlp_en
+                    snippet = await run_in_executor(
+                        extract_snippet_from_html,
+                        query,
+                        html,
+                        ft=ft,
+                        nlp=nlp,
+                        lang=lang) or snippet
+                except Exception:
+                    pass
+            summary = f'Title: {title}\nURL: {url}\n{snippet}'
+            docs.append(summary)
+
+        return '\n\n'.join(docs)
+
+    @staticmethod
+    async def _fetch_webpage(session, url: str) -> str:
+        import aiohttp
+
+        url = parse.unquote(url)
+        timeout = aiohttp.ClientTimeout(total=5)
+        async with session.get(url, timeout=timeout) as response:
+            return await response.text(encoding='utf-8', errors='replace')
+
+    @staticmethod
+    def _classify_language(query: str) -> str:
         import langid
 
         langid.set_languages(['en', 'zh'])
-        lang = langid.classify(query)[0]
-
-        response = self.bing_search_api(query)
+        return langid.classify(query)[0]
 
+    @staticmethod
+    def _parse_response(response: dict, topk: int):
         webpages = {w['id']: w for w in response['webPages']['value']}
         raw_urls = []
         raw_snippets = []
@@ -169,19 +246,4 @@ class BingSearch(BaseTool):
                         raw_snippets.append(n['description'])
                         raw_titles.append(n['name'])
 
-        urls, snippets, titles = filter_urls(
-            raw_urls, raw_snippets, raw_titles, topk=topk)
-
-        docs = []
-        for url, snippet, title in zip(urls, snippets, titles):
-            try:
-                ft = self.ft_zh if lang == 'zh' else self.ft_en
-                nlp = self.nlp_zh if lang == 'zh' else self.nlp_en
-                snippet = extract_snippet(
-                    query, url, ft=ft, nlp=nlp, lang=lang) or snippet
-            except Exception:
-                pass
-            summary = f'Title: {title}\nURL: {url}\n{snippet}'
-            docs.append(summary)
-
-        return '\n\n'.join(docs)
+        return filter_urls(raw_urls, raw_snippets, raw_titles, topk=topk)
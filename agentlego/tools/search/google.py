@@ -3,6 +3,7 @@ from typing import List, Tuple, Union
 
 import requests
 
+from agentlego.utils import is_package_available
 from ..base import BaseTool
 
 
@@ -71,6 +72,16 @@ class GoogleSearch(BaseTool):
     def apply(self, query: str) -> str:
         status_code, results = self._search(
             query, search_type=self.search_type, k=self.k)
+        return self._handle_response(status_code, results)
+
+    async def aapply(self, query: str) -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(query)
+        status_code, results = await self._asearch(
+            query, search_type=self.search_type, k=self.k)
+        return self._handle_response(status_code, results)
+
+    def _handle_response(self, status_code: int, results: Union[dict, str]) -> str:
         # convert search results to ToolReturn format
         if status_code == 200:
             results = self._parse_results(results)
@@ -159,12 +170,7 @@ class GoogleSearch(BaseTool):
             - status_code (int): HTTP status code from Serper API.
             - response (dict): response context with json format.
         """
-        headers = {
-            'X-API-KEY': self.api_key,
-            'Content-Type': 'application/json',
-        }
-        params = {k: v for k, v in kwargs.items() if v is not None}
-        params['q'] = query
+        headers, params = self._request_args(query, **kwargs)
 
         try:
             response = requests.post(
@@ -175,3 +181,34 @@ class GoogleSearch(BaseTool):
         except Exception as e:
             return -1, str(e)
         return response.status_code, response.json()
+
+    async def _asearch(self,
+                       query: str,
+                       search_type: str = 'search',
+                       **kwargs) -> Tuple[int, Union[dict, str]]:
+        """The asynchronous version of :meth:`_search`."""
+        import aiohttp
+
+        headers, params = self._request_args(query, **kwargs)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.post(
+                        f'https://google.serper.dev/{search_type}',
+                        headers=headers,
+                        params={k: str(v)
+                                for k, v in params.items()},
+                ) as response:
+                    return response.status, await response.json(content_type=None)
+        except Exception as e:
+            return -1, str(e)
+
+    def _request_args(self, query: str, **kwargs) -> Tuple[dict, dict]:
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json',
+        }
+        params = {k: v for k, v in kwargs.items() if v is not None}
+        params['q'] = query
+        return headers, params
@@ -1,4 +1,9 @@
+import hashlib
 import random
+import re
+import threading
+import weakref
+from collections import Counter, OrderedDict
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional, Tuple
 
@@ -20,6 +25,13 @@ else:
 GLOBAL_SEED = 1912
 
 
+def infer_sam_type(model: str) -> str:
+    """Infer the key in ``sam_model_registry`` from the checkpoint name, like
+    ``vit_b`` of ``sam_vit_b_01ec64.pth``. Defaults to ``vit_h``."""
+    match = re.search(r'vit_[hlb]', Path(model).name)
+    return match.group() if match else 'vit_h'
+
+
 def load_sam_and_predictor(model, device=None, ckpt_path=None):
 
     def _load_sam(model, ckpt_path, device):
@@ -37,33 +49,115 @@ def load_sam_and_predictor(model, device=None, ckpt_path=None):
         else:
             ckpt_path = download_checkpoint(url)
 
-        sam = sam_model_registry['vit_h'](checkpoint=ckpt_path)
+        sam = sam_model_registry[infer_sam_type(model)](checkpoint=ckpt_path)
         sam.to(device=device)
         return sam
 
-    def _load_sam_predictor(sam):
-        return SamPredictor(sam)
+    def _load_sam_predictor(sam, model_id):
+        return SamPredictor(sam, model_id=model_id)
 
     sam = load_or_build_object(_load_sam, model, ckpt_path, device)
-    sam_predictor = load_or_build_object(_load_sam_predictor, sam)
+    sam_predictor = load_or_build_object(_load_sam_predictor, sam,
+                                         f'{model}@{device}')
     return sam, sam_predictor
 
 
+class SamEmbeddingCache:
+    """A thread-safe LRU cache of the SAM image embeddings, shared by all SAM
+    predictors in the process, so that the following edits of the same image
+    skip the image encoder.
+
+    Args:
+        max_items (int): The maximum number of cached embeddings. Every
+            embedding of the ViT-H model takes about 4 MB. Defaults to 16.
+    """
+
+    def __init__(self, max_items: int = 16):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        # {model_id: number of the alive predictors}
+        self._predictors = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_id: str, image: np.ndarray, image_format: str) -> str:
+        image = np.ascontiguousarray(image)
+        digest = hashlib.sha256(image.data).hexdigest()
+        return f'{model_id}:{image_format}:{image.shape}:{image.dtype}:{digest}'
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: dict):
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def register(self, predictor, model_id: str):
+        """Drop the embeddings of the model once all predictors of the model
+        are released, since the embeddings are on the device of the model."""
+        with self._lock:
+            self._predictors[model_id] += 1
+        weakref.finalize(predictor, self._unregister, model_id)
+
+    def _unregister(self, model_id: str):
+        with self._lock:
+            self._predictors[model_id] -= 1
+            if self._predictors[model_id] <= 0:
+                del self._predictors[model_id]
+                self._drop(model_id)
+
+    def _drop(self, model_id: str):
+        prefix = f'{model_id}:'
+        for key in [key for key in self._items if key.startswith(prefix)]:
+            del self._items[key]
+
+    def clear(self, model_id: Optional[str] = None):
+        """Drop all embeddings, or only the embeddings of the model."""
+        with self._lock:
+            if model_id is None:
+                self._items.clear()
+            else:
+                self._drop(model_id)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+SAM_EMBEDDING_CACHE = SamEmbeddingCache()
+
+
 class SamPredictor:
 
     @require(('torch', 'segment_anything'))
     def __init__(
         self,
         sam_model,
+        model_id: Optional[str] = None,
     ) -> None:
         """Uses SAM to calculate the image embedding for an image, and then
         allow repeated, efficient mask prediction given prompts.
 
+        The image embeddings are cached in :data:`SAM_EMBEDDING_CACHE` by the
+        image content and the model id, and they are dropped once the
+        predictor is released, like after the tools using it are torn down.
+
         Arguments:
           sam_model (Sam): The model to use for mask prediction.
+          model_id (str | None): The identifier of the model weights in the
+            embedding cache. Defaults to None, which means to identify by the
+            model object.
         """
         super().__init__()
         self.model = sam_model
+        self.model_id = model_id or f'{type(sam_model).__name__}@{id(sam_model)}'
+        SAM_EMBEDDING_CACHE.register(self, self.model_id)
 
         from segment_anything.utils.transforms import ResizeLongestSide
 
@@ -86,6 +180,11 @@ class SamPredictor:
             'RGB',
             'BGR',
         ], f"image_format must be in ['RGB', 'BGR'], is {image_format}."
+        key = SAM_EMBEDDING_CACHE.make_key(self.model_id, image, image_format)
+        features = SAM_EMBEDDING_CACHE.get(key)
+        if features is not None:
+            return features
+
         if image_format != self.model.image_format:
             image = image[..., ::-1]
 
@@ -95,7 +194,9 @@ class SamPredictor:
         input_image_torch = input_image_torch.permute(2, 0,
                                                       1).contiguous()[None, :, :, :]
 
-        return self.set_torch_image(input_image_torch, image.shape[:2])
+        features = self.set_torch_image(input_image_torch, image.shape[:2])
+        SAM_EMBEDDING_CACHE.put(key, features)
+        return features
 
     def set_torch_image(
         self,
@@ -121,7 +222,8 @@ class SamPredictor:
         original_size = original_image_size
         input_size = tuple(transformed_image.shape[-2:])
         input_image = self.model.preprocess(transformed_image)
-        features = self.model.image_encoder(input_image)
+        with torch.no_grad():
+            features = self.model.image_encoder(input_image)
 
         res = {
             'features': features,
@@ -306,9 +408,22 @@ class SegmentAnything(BaseTool):
 
     Args:
         sam_model (str): The model name used to inference. Which can be found
-            in the ``segment_anything`` repository.
+            in the ``segment_anything`` repository, and the model type
+            (``vit_h``, ``vit_l`` or ``vit_b``) is inferred from the name.
             Defaults to ``sam_vit_h_4b8939.pth``.
         device (str): The device to load the model. Defaults to 'cuda'.
+        points_per_side (int): The number of points to sample along one side
+            of the image. Fewer points are faster but may miss small objects.
+            Defaults to 32.
+        points_per_batch (int): The number of points to run by the model
+            simultaneously. Higher numbers may be faster but use more memory.
+            Defaults to 64.
+        crop_n_layers (int): The number of layers to run the mask generation on
+            the crops of the image, which improves small objects but is
+            slower. Defaults to 0.
+        max_image_size (int | None): Downscale the image whose long side is
+            larger than it before generating the masks. Defaults to None,
+            which means to use the full resolution.
         toolmeta (None | dict | ToolMeta): The additional info of the tool.
             Defaults to None.
     """
@@ -320,30 +435,53 @@ class SegmentAnything(BaseTool):
     def __init__(self,
                  sam_model: str = 'sam_vit_h_4b8939.pth',
                  device: str = 'cuda',
+                 points_per_side: int = 32,
+                 points_per_batch: int = 64,
+                 crop_n_layers: int = 0,
+                 max_image_size: Optional[int] = None,
                  toolmeta=None):
         super().__init__(toolmeta=toolmeta)
         self.sam_model = sam_model
         self.device = device
+        self.points_per_side = points_per_side
+        self.points_per_batch = points_per_batch
+        self.crop_n_layers = crop_n_layers
+        self.max_image_size = max_image_size
+        # The mask generator keeps the image state of its predictor.
+        self._generator_lock = threading.Lock()
 
     def setup(self):
+        from segment_anything import SamAutomaticMaskGenerator
+
         self.sam, self.sam_predictor = load_sam_and_predictor(
             self.sam_model, device=self.device)
+        self.mask_generator = SamAutomaticMaskGenerator(
+            self.sam,
+            points_per_side=self.points_per_side,
+            points_per_batch=self.points_per_batch,
+            crop_n_layers=self.crop_n_layers,
+        )
 
     def apply(self, image: ImageIO
               ) -> Annotated[ImageIO, Info('The segmentation result image.')]:
-        annos = self.segment_anything(image.to_array())
+        img = image.to_array()
+        h, w = img.shape[:2]
+        if self.max_image_size and max(h, w) > self.max_image_size:
+            scale = self.max_image_size / max(h, w)
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            img = np.asarray(Image.fromarray(img).resize(size, Image.BILINEAR))
+
+        annos = self.segment_anything(img)
         full_img, _ = self.show_annos(annos)
+        if full_img.size != (w, h):
+            full_img = full_img.resize((w, h), Image.NEAREST)
         return ImageIO(full_img)
 
     def segment_anything(self, img):
-        if not self._is_setup:
-            self.setup()
-            self._is_setup = True
+        self._setup_once()
 
-        from segment_anything import SamAutomaticMaskGenerator
-
-        mask_generator = SamAutomaticMaskGenerator(self.sam)
-        annos = mask_generator.generate(img)
+        with self._generator_lock:
+            annos = self.mask_generator.generate(img)
 
         return annos
 
@@ -369,41 +507,44 @@ class SegmentAnything(BaseTool):
 
     def get_detection_map(self, img):
         annos = self.segment_anything(img)
-        _, detection_map = self.show_anns(annos)
+        _, detection_map = self.show_annos(annos)
 
         return detection_map
 
     def show_annos(self, anns):
+        """Draw the masks with random colors, where the later masks cover the
+        former ones.
+
+        Returns:
+            tuple[Image.Image, np.ndarray]: The colored image and the uint16
+            label map, where 0 is the background and ``i + 1`` is the i-th
+            mask.
+        """
         if len(anns) == 0:
             return
 
-        sorted_anns = sorted(anns, key=(lambda x: x['area']), reverse=True)
-        full_img = None
-
-        # for ann in sorted_anns:
-        for i in range(len(sorted_anns)):
-            ann = anns[i]
+        h, w = anns[0]['segmentation'].shape
+        label_map = np.zeros((h, w), dtype=np.uint16)
+        for i, ann in enumerate(anns):
             m = ann['segmentation']
-            if full_img is None:
-                full_img = np.zeros((m.shape[0], m.shape[1], 3))
-                map = np.zeros((m.shape[0], m.shape[1]), dtype=np.uint16)
-            map[m != 0] = i + 1
-            color_mask = np.random.random((1, 3)).tolist()[0]
-            full_img[m != 0] = color_mask
-        full_img = full_img * 255
-
-        res = np.zeros((map.shape[0], map.shape[1], 3))
-        res[:, :, 0] = map % 256
-        res[:, :, 1] = map // 256
-        res.astype(np.float32)
-        full_img = Image.fromarray(np.uint8(full_img))
-        return full_img, res
+            if 'bbox' in ann:
+                # Only write the region of the mask.
+                x, y, bw, bh = (int(v) for v in ann['bbox'])
+                region = label_map[y:y + bh + 1, x:x + bw + 1]
+                region[m[y:y + bh + 1, x:x + bw + 1]] = i + 1
+            else:
+                label_map[m] = i + 1
+
+        # The color lookup table, and the background is black.
+        colors = np.random.random((len(anns), 3))
+        lut = np.zeros((len(anns) + 1, 3), dtype=np.uint8)
+        lut[1:] = colors * 255
+        full_img = Image.fromarray(lut[label_map])
+        return full_img, label_map
 
 
 def get_image_embedding(self, img):
-    if not self._is_setup:
-        self.setup()
-        self._is_setup = True
+    self._setup_once()
 
     embedding = self.sam_predictor.set_image(img)
 
@@ -472,9 +613,7 @@ class SegmentObject(BaseTool):
         return ImageIO(output_image)
 
     def get_mask_with_boxes(self, image, boxes_filt):
-        if not self._is_setup:
-            self.setup()
-            self._is_setup = True
+        self._setup_once()
 
         boxes_filt = boxes_filt.cpu()
         transformed_boxes = self.sam_predictor.transform.apply_boxes_torch(
@@ -492,9 +631,7 @@ class SegmentObject(BaseTool):
         return masks
 
     def segment_image_with_boxes(self, image, boxes_filt, pred_phrases):
-        if not self._is_setup:
-            self.setup()
-            self._is_setup = True
+        self._setup_once()
 
         masks = self.get_mask_with_boxes(image, boxes_filt)
 
@@ -3,6 +3,7 @@ from urllib.parse import quote_plus
 import requests
 
 from agentlego.types import Annotated, Info
+from agentlego.utils import is_package_available
 from ..base import BaseTool
 
 LANG_CODES = {
@@ -32,6 +33,7 @@ class Translation(BaseTool):
         super().__init__(toolmeta=toolmeta)
         if backend == 'google':
             self._translate = self.google_translate
+            self._atranslate = self.google_atranslate
         else:
             raise NotImplementedError(f'The backend {backend} is not available.')
 
@@ -43,12 +45,39 @@ class Translation(BaseTool):
     ) -> str:
         return self._translate(text, target, source)
 
+    async def aapply(self, text: str, target: str, source: str = 'auto') -> str:
+        if not is_package_available('aiohttp'):
+            return await super().aapply(text, target, source)
+        return await self._atranslate(text, target, source)
+
     def google_translate(self, text: str, target: str, source: str = 'auto') -> str:
+        url = self._google_translate_url(text, target, source)
+        response = requests.get(url, timeout=10).json()
+        return self._parse_google_translate(response)
+
+    async def google_atranslate(self,
+                                text: str,
+                                target: str,
+                                source: str = 'auto') -> str:
+        import aiohttp
+
+        url = self._google_translate_url(text, target, source)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url) as response:
+                response = await response.json(content_type=None)
+        return self._parse_google_translate(response)
+
+    @staticmethod
+    def _google_translate_url(text: str, target: str, source: str) -> str:
         text = quote_plus(text)
         url_tmpl = ('https://translate.googleapis.com/translate_a/'
                     'single?client=gtx&sl={}&tl={}&dt=at&dt=bd&dt=ex&'
                     'dt=ld&dt=md&dt=qca&dt=rw&dt=rm&dt=ss&dt=t&q={}')
-        response = requests.get(url_tmpl.format(source, target, text), timeout=10).json()
+        return url_tmpl.format(source, target, text)
+
+    @staticmethod
+    def _parse_google_translate(response) -> str:
         try:
             result = ''.join(x[0] for x in response[0] if x[0] is not None)
         except Exception:
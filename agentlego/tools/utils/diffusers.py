@@ -1,7 +1,151 @@
+import threading
+import weakref
 from typing import Optional
 
 from agentlego.utils import load_or_build_object
 
+# The default base models of the engines.
+ENGINE_DEFAULTS = {
+    'sd':
+    dict(
+        model='runwayml/stable-diffusion-v1-5',
+        variant='fp16',
+        vae=None,
+        vae_variant=None,
+    ),
+    'sdxl':
+    dict(
+        model='stabilityai/stable-diffusion-xl-base-1.0',
+        variant='fp16',
+        vae='madebyollin/sdxl-vae-fp16-fix',
+        vae_variant=None,
+    ),
+}
+
+
+class DiffusionEngine:
+    """The Stable Diffusion engine shared by the tools on the same base model.
+
+    The engine holds a single copy of the base weights on the device, and the
+    ControlNet models are loaded on demand and attached to pipelines built
+    from the shared components of the base pipeline. Therefore, the
+    text-to-image tool and all ControlNet tools on the same base model only
+    cost the memory of one base model and their ControlNet models.
+
+    The engine only keeps weak references to the ControlNet pipelines, so
+    that a ControlNet model is released once no tool holds its pipeline.
+
+    Since the pipelines share the modules and the scheduler, the calls of the
+    engine are serialized.
+
+    Args:
+        arch (str): The architecture of the base model, "sd" or "sdxl".
+        model (str): The name of the base model.
+        variant (str | None): The variant of the base model weights.
+        vae (str | None): The name of the VAE model to replace the VAE of the
+            base model. Defaults to None.
+        vae_variant (str | None): The variant of the VAE model weights.
+            Defaults to None.
+        device (str | None): The device to load the models. Defaults to None.
+    """
+
+    def __init__(self,
+                 arch: str,
+                 model: str,
+                 variant: Optional[str] = None,
+                 vae: Optional[str] = None,
+                 vae_variant: Optional[str] = None,
+                 device=None):
+        import torch
+        from diffusers import (AutoencoderKL, StableDiffusionControlNetPipeline,
+                               StableDiffusionPipeline,
+                               StableDiffusionXLControlNetPipeline,
+                               StableDiffusionXLPipeline)
+
+        assert arch in ENGINE_DEFAULTS, f'Unsupported architecture {arch!r}.'
+        if arch == 'sdxl':
+            t2i_cls = StableDiffusionXLPipeline
+            self._controlnet_cls = StableDiffusionXLControlNetPipeline
+        else:
+            t2i_cls = StableDiffusionPipeline
+            self._controlnet_cls = StableDiffusionControlNetPipeline
+
+        self.arch = arch
+        self.device = device
+        self.dtype = torch.float16 if 'cuda' in str(device) else torch.float32
+
+        params = {'torch_dtype': self.dtype}
+        if variant is not None:
+            params['variant'] = variant
+        if vae is not None:
+            params['vae'] = AutoencoderKL.from_pretrained(
+                vae, torch_dtype=self.dtype, variant=vae_variant)
+        self.t2i = t2i_cls.from_pretrained(model, **params).to(device)
+
+        # {(controlnet, variant): pipeline} of the pipelines held by others.
+        self._pipelines = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    def pipeline(self,
+                 controlnet: Optional[str] = None,
+                 controlnet_variant: Optional[str] = None):
+        """Get the pipeline of the base model with the specified ControlNet.
+
+        Args:
+            controlnet (str | None): The name of the ControlNet model. Defaults
+                to None, which means the text-to-image pipeline.
+            controlnet_variant (str | None): The variant of the ControlNet
+                model weights. Defaults to None.
+
+        Returns:
+            The diffusers pipeline which shares the base weights. Keep the
+            pipeline to keep the ControlNet model loaded.
+        """
+        if controlnet is None:
+            return self.t2i
+
+        key = (controlnet, controlnet_variant)
+        with self._lock:
+            pipe = self._pipelines.get(key)
+            if pipe is None:
+                from diffusers import ControlNetModel
+                model = ControlNetModel.from_pretrained(
+                    controlnet,
+                    torch_dtype=self.dtype,
+                    variant=controlnet_variant,
+                ).to(self.device)
+                pipe = self._controlnet_cls(**self.t2i.components, controlnet=model)
+                self._pipelines[key] = pipe
+        return pipe
+
+    def __call__(self,
+                 *args,
+                 controlnet: Optional[str] = None,
+                 controlnet_variant: Optional[str] = None,
+                 **kwargs):
+        """Run the pipeline with the specified ControlNet, and the other
+        arguments are forwarded to the pipeline."""
+        pipe = self.pipeline(controlnet, controlnet_variant)
+        with self._lock:
+            return pipe(*args, **kwargs)
+
+
+def load_diffusion_engine(arch: str = 'sd', device=None, **kwargs) -> DiffusionEngine:
+    """Get the shared diffusion engine of the base model on the device.
+
+    Args:
+        arch (str): The architecture of the base model, "sd" or "sdxl".
+            Defaults to "sd".
+        device (str | None): The device to load the models. Defaults to None.
+        **kwargs: The arguments to override :data:`ENGINE_DEFAULTS` of the
+            architecture, see :class:`DiffusionEngine`.
+
+    Returns:
+        DiffusionEngine: The engine shared by the same arguments.
+    """
+    params = {**ENGINE_DEFAULTS[arch], **kwargs}
+    return load_or_build_object(DiffusionEngine, arch, device=device, **params)
+
 
 def load_sd(model: str = 'runwayml/stable-diffusion-v1-5',
             variant: Optional[str] = 'fp16',
@@ -10,37 +154,15 @@ def load_sd(model: str = 'runwayml/stable-diffusion-v1-5',
             controlnet: Optional[str] = None,
             controlnet_variant: Optional[str] = None,
             device=None):
-    import torch
-    from diffusers import (AutoencoderKL, ControlNetModel,
-                           StableDiffusionControlNetPipeline, StableDiffusionPipeline)
-
-    dtype = torch.float16 if 'cuda' in str(device) else torch.float32
-    params = {'torch_dtype': dtype}
-
-    if variant is not None:
-        params['variant'] = variant
-    if vae is not None:
-        vae = load_or_build_object(
-            AutoencoderKL.from_pretrained,
-            vae,
-            torch_dtype=dtype,
-            variant=vae_variant,
-        )
-        params['vae'] = vae
-
-    t2i = load_or_build_object(StableDiffusionPipeline.from_pretrained, model, **params)
-
-    if controlnet is None:
-        return t2i.to(device)
-    else:
-        controlnet = load_or_build_object(
-            ControlNetModel.from_pretrained,
-            controlnet,
-            torch_dtype=dtype,
-            variant=controlnet_variant,
-        )
-        pipe = StableDiffusionControlNetPipeline(**t2i.components, controlnet=controlnet)
-        return pipe.to(device)
+    engine = load_diffusion_engine(
+        'sd',
+        model=model,
+        variant=variant,
+        vae=vae,
+        vae_variant=vae_variant,
+        device=device,
+    )
+    return engine.pipeline(controlnet, controlnet_variant)
 
 
 def load_sdxl(model: str = 'stabilityai/stable-diffusion-xl-base-1.0',
@@ -50,36 +172,12 @@ def load_sdxl(model: str = 'stabilityai/stable-diffusion-xl-base-1.0',
               controlnet: Optional[str] = None,
               controlnet_variant: Optional[str] = None,
               device=None):
-    import torch
-    from diffusers import (AutoencoderKL, ControlNetModel,
-                           StableDiffusionXLControlNetPipeline,
-                           StableDiffusionXLPipeline)
-    dtype = torch.float16 if 'cuda' in str(device) else torch.float32
-    params = {'torch_dtype': dtype}
-
-    if variant is not None:
-        params['variant'] = variant
-    if vae is not None:
-        vae = load_or_build_object(
-            AutoencoderKL.from_pretrained,
-            vae,
-            torch_dtype=dtype,
-            variant=vae_variant,
-        )
-        params['vae'] = vae
-
-    t2i = load_or_build_object(StableDiffusionXLPipeline.from_pretrained, model,
-                               **params)
-
-    if controlnet is None:
-        return t2i.to(device)
-    else:
-        controlnet = load_or_build_object(
-            ControlNetModel.from_pretrained,
-            controlnet,
-            torch_dtype=dtype,
-            variant=controlnet_variant,
-        )
-        pipe = StableDiffusionXLControlNetPipeline(
-            **t2i.components, controlnet=controlnet)
-        return pipe.to(device)
+    engine = load_diffusion_engine(
+        'sdxl',
+        model=model,
+        variant=variant,
+        vae=vae,
+        vae_variant=vae_variant,
+        device=device,
+    )
+    return engine.pipeline(controlnet, controlnet_variant)
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def _dilate_axis(mask: np.ndarray, padding: int, axis: int) -> np.ndarray:
+    """Dilate the mask along an axis by the window sums of the cumulative
+    sums."""
+    length = mask.shape[axis]
+    cumsum = np.cumsum(mask, axis=axis, dtype=np.int64)
+    zeros_shape = list(mask.shape)
+    zeros_shape[axis] = 1
+    cumsum = np.concatenate([np.zeros(zeros_shape, dtype=np.int64), cumsum], axis=axis)
+
+    indices = np.arange(length)
+    upper = np.minimum(indices + padding + 1, length)
+    lower = np.maximum(indices - padding, 0)
+    window = np.take(cumsum, upper, axis=axis) - np.take(cumsum, lower, axis=axis)
+    return window > 0
+
+
+def dilate_mask(mask: np.ndarray, padding: int) -> np.ndarray:
+    """Dilate a 2D mask by a square window, where every pixel within
+    ``padding`` pixels of a true pixel becomes true.
+
+    Args:
+        mask (np.ndarray): The mask of shape (H, W).
+        padding (int): The number of pixels to expand on every side.
+
+    Returns:
+        np.ndarray: The dilated boolean mask of shape (H, W).
+    """
+    mask = np.asarray(mask).astype(bool)
+    if padding <= 0 or not mask.any():
+        return mask
+
+    try:
+        import cv2
+    except ImportError:
+        cv2 = None
+
+    if cv2 is not None:
+        kernel = np.ones((2 * padding + 1, 2 * padding + 1), dtype=np.uint8)
+        return cv2.dilate(mask.astype(np.uint8), kernel).astype(bool)
+
+    # The square window is separable into the rows and the columns.
+    return _dilate_axis(_dilate_axis(mask, padding, axis=0), padding, axis=1)
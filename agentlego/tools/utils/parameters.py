@@ -1,4 +1,3 @@
-import copy
 import inspect
 from typing import Callable, Optional, Tuple, Union
 
@@ -34,7 +33,7 @@ def get_input_parameters(func: Callable) -> Tuple[Parameter, ...]:
             default=p.default if p.default is not inspect._empty else None,
         )
         if info is not None:
-            input_.update(info)
+            input_ = input_.merge(info)
         inputs.append(input_)
     return tuple(inputs)
 
@@ -62,7 +61,7 @@ def get_output_parameters(func: Callable) -> Optional[Tuple[Parameter, ...]]:
 
         output = Parameter(type=annotation)
         if info is not None:
-            output.update(info)
+            output = output.merge(info)
         outputs.append(output)
     return tuple(outputs)
 
@@ -75,8 +74,9 @@ def extract_toolmeta(func: Callable, override: Optional[ToolMeta] = None) -> Too
         assert len(inputs) == len(
             override.inputs), ('The length of `inputs` in toolmeta is different with '
                                f'the number of arguments of `{func.__qualname__}`.')
-        for input_, new_input in zip(inputs, override.inputs):
-            input_.update(new_input)
+        inputs = tuple(
+            input_.merge(new_input)
+            for input_, new_input in zip(inputs, override.inputs))
     for input_ in inputs:
         assert input_.type is not inspect._empty, (
             f'The type of input `{input_.name}` of '
@@ -95,8 +95,9 @@ def extract_toolmeta(func: Callable, override: Optional[ToolMeta] = None) -> Too
         assert len(outputs) == len(override.outputs), (
             'The length of `outputs` in toolmeta is different with '
             f'the type hint of return value of `{func.__qualname__}`.')
-        for output, new_output in zip(outputs, override.outputs):
-            output.update(new_output)
+        outputs = tuple(
+            output.merge(new_output)
+            for output, new_output in zip(outputs, override.outputs))
     for output in outputs:
         assert output.type is not inspect._empty, (
             f'The type of output `{output.name}` of '
@@ -107,9 +108,7 @@ def extract_toolmeta(func: Callable, override: Optional[ToolMeta] = None) -> Too
             ', '.join(i.__name__ for i in supported_types))
 
     if override:
-        toolmeta = copy.deepcopy(override)
-        toolmeta.inputs = tuple(inputs)
-        toolmeta.outputs = tuple(outputs)
+        toolmeta = override.replace(inputs=tuple(inputs), outputs=tuple(outputs))
     else:
         toolmeta = ToolMeta(inputs=inputs, outputs=outputs)
 
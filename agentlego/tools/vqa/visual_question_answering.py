@@ -1,3 +1,5 @@
+from typing import List
+
 from agentlego.types import Annotated, ImageIO, Info
 from agentlego.utils import load_or_build_object, require
 from ..base import BaseTool
@@ -40,3 +42,9 @@ class VQA(BaseTool):
     ) -> str:
         image = image.to_array()[:, :, ::-1]
         return self._inferencer(image, question)[0]['pred_answer']
+
+    def apply_batch(self, batch_inputs: List[dict]) -> List[str]:
+        images = [inputs['image'].to_array()[:, :, ::-1] for inputs in batch_inputs]
+        questions = [inputs['question'] for inputs in batch_inputs]
+        results = self._inferencer(images, questions, batch_size=len(images))
+        return [item['pred_answer'] for item in results]
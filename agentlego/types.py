@@ -13,39 +13,76 @@ if TYPE_CHECKING:
     import torch
 
 
-def _typename(obj):
-    return f'{type(obj).__module__}.{type(obj).__name__}'
-
-
 class IOType:
+    """The base class of the multi-modal inputs and outputs.
+
+    The value can be converted to every type in ``support_types`` by
+    :meth:`to`, and the converted values are cached on the object, so that
+    repeated conversions cost nothing after the first. The cached values are
+    shared by all callers and should not be modified in-place. Use
+    :meth:`clear_cache` to drop them, or set ``enable_cache`` to False to
+    disable the cache.
+    """
     support_types = {}
+    enable_cache = True
+
+    # The mapping from the value types to the names in `support_types`.
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
 
     def __init__(self, value):
         if type(value).__qualname__ == 'AgentType':
             # Handle hugginface agent
             value = value._value
 
-        self.type = None
-        for name, cls in self.support_types.items():
-            if isinstance(cls, type) and isinstance(value, cls):
-                self.value = value
-                self.type = name
-            elif isinstance(cls, str) and _typename(value) == cls:
-                self.value = value
-                self.type = name
+        self.type = self._dispatch_type(type(value))
         if self.type is None:
             raise NotImplementedError(f'The value type `{type(value)}` is not '
                                       f'supported by `{self.__class__.__name__}`')
+        self.value = value
+        self._cache = {}
+
+    @classmethod
+    def _dispatch_type(cls, value_type: type) -> Optional[str]:
+        """Get the name in ``support_types`` of the value type, which is only
+        resolved once for every value type."""
+        try:
+            return cls._dispatch[value_type]
+        except KeyError:
+            pass
+
+        typename = f'{value_type.__module__}.{value_type.__name__}'
+        matched = None
+        # Use the last matched type if multiple types are matched.
+        for name, support_type in cls.support_types.items():
+            if isinstance(support_type, type) and issubclass(value_type, support_type):
+                matched = name
+            elif isinstance(support_type, str) and typename == support_type:
+                matched = name
+        cls._dispatch[value_type] = matched
+        return matched
 
     def to(self, dst_type: str):
         if self.type == dst_type:
             return self.value
+        if dst_type in self._cache:
+            return self._cache[dst_type]
 
         assert dst_type in self.support_types
         convert_fn = f'_{self.type}_to_{dst_type}'
         assert hasattr(self, convert_fn)
 
-        return getattr(self, convert_fn)(self.value)
+        result = getattr(self, convert_fn)(self.value)
+        if self.enable_cache:
+            self._cache[dst_type] = result
+        return result
+
+    def clear_cache(self):
+        """Drop the cached converted values to save memory."""
+        self._cache.clear()
 
     def __str__(self) -> str:
         return f'{self.__class__.__name__}(value={self.value})'
@@ -111,8 +148,8 @@ class ImageIO(IOType):
         return self.to('array')
 
     def to_file(self) -> IOBase:
-        if self.type == 'path':
-            return open(self.value, 'rb')
+        if self.type == 'path' or 'path' in self._cache:
+            return open(self.to_path(), 'rb')
         else:
             file = BytesIO()
             self.to_pil().save(file, 'PNG')
@@ -176,7 +213,12 @@ class AudioIO(IOType):
         if self._sampling_rate is not None:
             return self._sampling_rate
         elif self.type == 'path':
-            self.to('tensor')
+            import torchaudio
+            try:
+                # Only read the metadata instead of decoding the whole audio.
+                self._sampling_rate = torchaudio.info(self.value).sample_rate
+            except (AttributeError, RuntimeError):
+                self.to('tensor')
             return self._sampling_rate
         else:
             return self.DEFAULT_SAMPLING_RATE
@@ -1,13 +1,23 @@
-from .cache import load_or_build_object
+from .cache import OBJECT_CACHE, ObjectCache, load_or_build_object
+from .concurrency import run_in_executor
 from .dependency import is_package_available, require
-from .file import download_checkpoint, download_url_to_file, temp_path
+from .file import download_checkpoint, download_url_to_file, get_cache_dir, temp_path
 from .misc import apply_to
 from .module import resolve_module
-from .openapi import APIOperation, OpenAPISpec
 from .parse import *  # noqa: F401, F403
 
-__all__ = [
+
+def __getattr__(name: str):
+    # The OpenAPI utilities are slow to import, and only used by remote tools.
+    if name in ('APIOperation', 'OpenAPISpec'):
+        from . import openapi
+        return getattr(openapi, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+__all__ = [  # noqa: F405
     'temp_path', 'load_or_build_object', 'require', 'is_package_available',
     'download_checkpoint', 'download_url_to_file', 'OpenAPISpec', 'APIOperation',
-    'resolve_module', 'apply_to'
+    'resolve_module', 'apply_to', 'run_in_executor', 'ObjectCache', 'OBJECT_CACHE',
+    'get_cache_dir'
 ]
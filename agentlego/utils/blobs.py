@@ -0,0 +1,103 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+# The content type of a file part which refers to a blob by its digest instead
+# of carrying the content.
+BLOB_REF_MEDIA_TYPE = 'application/vnd.agentlego.blob-ref'
+
+# The response header to list the digests of the uploaded blobs stored by the
+# server, so that the client can refer to them in the following requests.
+BLOB_DIGESTS_HEADER = 'X-AgentLego-Blobs'
+
+
+def blob_digest(data: bytes) -> str:
+    """Get the digest of the content to address a blob."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """A thread-safe content-addressed store, which evicts the least recently
+    used blobs when the total size exceeds the limit.
+
+    Args:
+        max_bytes (int): The maximum total bytes of the stored blobs.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._blobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes) -> Optional[str]:
+        """Store the content.
+
+        Args:
+            data (bytes): The content.
+
+        Returns:
+            str | None: The digest of the content, or None if the content is
+            too large to store.
+        """
+        if len(data) > self.max_bytes:
+            return None
+
+        digest = blob_digest(data)
+        with self._lock:
+            if digest in self._blobs:
+                self._blobs.move_to_end(digest)
+                return digest
+            self._blobs[digest] = data
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._blobs.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Get the content by the digest, or None if the blob is not stored."""
+        with self._lock:
+            data = self._blobs.get(digest)
+            if data is not None:
+                self._blobs.move_to_end(digest)
+            return data
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._blobs
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+class BlobIndex:
+    """The digests of the blobs which are known to be stored by a server.
+
+    Args:
+        capacity (int): The maximum number of digests to remember.
+            Defaults to 4096.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, digests: Iterable[str]):
+        with self._lock:
+            for digest in digests:
+                self._digests[digest] = None
+                self._digests.move_to_end(digest)
+            while len(self._digests) > self.capacity:
+                self._digests.popitem(last=False)
+
+    def discard(self, digests: Iterable[str]):
+        with self._lock:
+            for digest in digests:
+                self._digests.pop(digest, None)
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._digests
@@ -1,13 +1,357 @@
-from typing import Callable
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-CACHED_OBJECTS = {}
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
 
 
-def load_or_build_object(constructor: Callable, *args, **kwargs):
-    tool_id = str((constructor.__qualname__, args, kwargs))
-    if tool_id in CACHED_OBJECTS:
-        return CACHED_OBJECTS[tool_id]
+def parse_size(size: str) -> int:
+    """Parse a human-readable size like ``512M`` or ``8GB`` to bytes."""
+    size = size.strip().upper().rstrip('B').rstrip('I')
+    unit = size[-1] if size and size[-1] in _SIZE_UNITS else ''
+    return int(float(size[:len(size) - len(unit)]) * _SIZE_UNITS[unit])
+
+
+def _typename(obj) -> str:
+    return f'{type(obj).__module__}.{type(obj).__name__}'
+
+
+def _canonicalize(obj, refs: List[Any]):
+    """Convert the object into a canonical form, where equal configs have the
+    same form regardless of the container types, the order of dict items and
+    the device type.
+
+    The objects without a canonical form are identified by ``id()``, and they
+    are appended to ``refs`` to keep the ids valid.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        return obj
+    elif isinstance(obj, (list, tuple)):
+        return ('seq', tuple(_canonicalize(item, refs) for item in obj))
+    elif isinstance(obj, dict):
+        items = [(_canonicalize(k, refs), _canonicalize(v, refs))
+                 for k, v in obj.items()]
+        return ('dict', tuple(sorted(items, key=repr)))
+    elif isinstance(obj, (set, frozenset)):
+        items = [_canonicalize(item, refs) for item in obj]
+        return ('set', tuple(sorted(items, key=repr)))
+    elif isinstance(obj, Enum):
+        return ('enum', type(obj).__qualname__, obj.name)
+    elif isinstance(obj, PurePath) or _typename(obj) == 'torch.device':
+        return str(obj)
+    elif hasattr(obj, '__self__') and hasattr(obj, '__func__'):
+        # Bound methods, like `Pipeline.from_pretrained` of different classes.
+        return ('method', _canonicalize(obj.__self__, refs),
+                _canonicalize(obj.__func__, refs))
+    elif isinstance(obj, type) or callable(obj) and hasattr(obj, '__qualname__'):
+        refs.append(obj)
+        return ('callable', getattr(obj, '__module__', None), obj.__qualname__, id(obj))
     else:
-        tool = constructor(*args, **kwargs)
-        CACHED_OBJECTS[tool_id] = tool
-        return tool
+        refs.append(obj)
+        return ('object', _typename(obj), id(obj))
+
+
+def make_key(constructor: Callable, *args, **kwargs) -> Tuple[str, List[Any]]:
+    """Make the cache key of an object built by ``constructor(*args, **kwargs)``.
+
+    Returns:
+        tuple[str, list]: The hashed key, and the arguments identified by
+        ``id()`` which should be kept alive with the key.
+    """
+    refs = []
+    canonical = _canonicalize((constructor, args, kwargs), refs)
+    return hashlib.sha256(repr(canonical).encode()).hexdigest(), refs
+
+
+def estimate_size(obj, max_depth: int = 3, seen: Optional[Set[int]] = None) -> int:
+    """Estimate the memory of an object by its tensors, arrays and the
+    parameters and buffers of the modules in its attributes.
+
+    Args:
+        obj: The object.
+        max_depth (int): The maximum depth to search the attributes.
+            Defaults to 3.
+        seen (set[int] | None): The ids of the counted objects, which are
+            skipped and updated by this call. Share it between calls to count
+            the objects shared by several objects only once. Defaults to None.
+
+    Returns:
+        int: The estimated bytes.
+    """
+    seen = set() if seen is None else seen
+
+    def _size(obj, depth):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+
+        typename = _typename(obj)
+        if typename in ('torch.Tensor', 'torch.nn.parameter.Parameter'):
+            return obj.numel() * obj.element_size()
+        elif typename == 'numpy.ndarray':
+            return obj.nbytes
+        elif hasattr(obj, 'parameters') and hasattr(obj, 'buffers') \
+                and callable(obj.parameters):
+            # torch.nn.Module, including the sub-modules.
+            return sum(_size(t, depth) for t in obj.parameters()) + \
+                sum(_size(t, depth) for t in obj.buffers())
+
+        if depth >= max_depth:
+            return 0
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            return sum(_size(item, depth + 1) for item in obj)
+        elif isinstance(obj, dict):
+            return sum(_size(item, depth + 1) for item in obj.values())
+        elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+            return sum(_size(item, depth + 1) for item in vars(obj).values())
+        return 0
+
+    return _size(obj, 0)
+
+
+@dataclass
+class CacheEntry:
+    """An object in the :class:`ObjectCache`."""
+    name: str
+    value: Any
+    refs: List[Any] = field(default_factory=list, repr=False)
+    size: int = 0
+    hits: int = 0
+    pinned: bool = False
+    last_used: float = field(default_factory=time.time)
+
+
+class ObjectCache:
+    """A thread-safe LRU cache of the heavy objects, like models, with a
+    memory budget.
+
+    Equal arguments are mapped to the same entry by canonical hashed keys. If
+    the estimated memory of all entries exceeds the budget, the least recently
+    used entries which are neither pinned nor used outside the cache will be
+    dropped.
+
+    Args:
+        max_bytes (int | None): The memory budget in bytes. Defaults to None,
+            which means to read from the ``AGENTLEGO_CACHE_MAX_MEMORY``
+            environment variable (like ``16G``), and no limit if not set.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None and os.getenv('AGENTLEGO_CACHE_MAX_MEMORY'):
+            max_bytes = parse_size(os.environ['AGENTLEGO_CACHE_MAX_MEMORY'])
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: Dict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.RLock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    def get_or_build(self, constructor: Callable, *args, **kwargs) -> Any:
+        """Get the cached object built by the same arguments, or build and
+        cache a new one.
+
+        Args:
+            constructor (Callable): The function to build the object.
+            *args: The positional arguments of the constructor.
+            **kwargs: The keyword arguments of the constructor.
+
+        Returns:
+            Any: The object.
+        """
+        key, refs = make_key(constructor, *args, **kwargs)
+        entry = self._get(key)
+        if entry is not None:
+            return entry.value
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        # Build outside the cache lock, and only once for concurrent callers.
+        with build_lock:
+            entry = self._get(key)
+            if entry is not None:
+                return entry.value
+
+            try:
+                value = constructor(*args, **kwargs)
+                name = getattr(constructor, '__qualname__', repr(constructor))
+                entry = CacheEntry(name=name, value=value, refs=refs)
+                with self._lock:
+                    self.misses += 1
+                    self._entries[key] = entry
+                    self._evict()
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+            return value
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                entry.last_used = time.time()
+                self.hits += 1
+            return entry
+
+    def _total_size(self) -> int:
+        # The objects shared by entries, like a model used by a cached tool,
+        # are only counted once.
+        seen = set()
+        return sum(
+            estimate_size(entry.value, seen=seen) for entry in self._entries.values())
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        # The objects may grow after construction, like a tool after setup.
+        total = self._total_size()
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            # Dropping an object still used by others frees nothing but makes
+            # the next call build a duplicate, so only drop the objects
+            # referenced by the entry and the argument of `getrefcount`.
+            if entry.pinned or sys.getrefcount(entry.value) > 2:
+                continue
+            del self._entries[key]
+            self.evictions += 1
+            total = self._total_size()
+
+    def _find(self, obj) -> List[str]:
+        return [key for key, entry in self._entries.items() if entry.value is obj]
+
+    def pin(self, obj):
+        """Keep the object in the cache regardless of the memory budget."""
+        with self._lock:
+            for key in self._find(obj):
+                self._entries[key].pinned = True
+
+    def unpin(self, obj):
+        """Allow the object to be evicted again."""
+        with self._lock:
+            for key in self._find(obj):
+                self._entries[key].pinned = False
+            self._evict()
+
+    def release(self, obj) -> bool:
+        """Drop the object from the cache.
+
+        Returns:
+            bool: Whether the object was in the cache.
+        """
+        with self._lock:
+            keys = self._find(obj)
+            for key in keys:
+                del self._entries[key]
+            return len(keys) > 0
+
+    def _keys_of(self, objs: Iterable) -> Set[str]:
+        ids = set()
+        for obj in objs:
+            ids.add(id(obj))
+            if hasattr(obj, '__dict__') and not isinstance(obj, type):
+                ids.update(id(value) for value in vars(obj).values())
+        return {key for key, entry in self._entries.items() if id(entry.value) in ids}
+
+    def keys_of(self, objs: Iterable) -> List[str]:
+        """Get the keys of the cached objects in ``objs`` and in the attributes
+        of ``objs``, which can be used by :meth:`release_unused` after the
+        references of the objects are dropped."""
+        with self._lock:
+            return list(self._keys_of(objs))
+
+    def release_unused(self, keys: Optional[Iterable[str]] = None) -> int:
+        """Drop the objects which are only referenced by the cache, like the
+        models of the tools which have been torn down.
+
+        Args:
+            keys (Iterable[str] | None): Only check the entries of the keys, and
+                the objects used by the dropped ones. Defaults to None, which
+                means to check all entries.
+
+        Returns:
+            int: The number of dropped objects.
+        """
+        num_released = 0
+        with self._lock:
+            candidates = set(self._entries if keys is None else keys)
+            changed = True
+            while changed:
+                # Dropping an object may release the objects used by it.
+                changed = False
+                for key in list(candidates):
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        candidates.discard(key)
+                        continue
+                    # Referenced by the entry and the argument of `getrefcount`.
+                    if not entry.pinned and sys.getrefcount(entry.value) <= 2:
+                        del self._entries[key]
+                        candidates.discard(key)
+                        num_released += 1
+                        changed = True
+                        if keys is not None:
+                            candidates |= self._keys_of([*entry.refs, entry.value])
+                entry = None
+        return num_released
+
+    def clear(self):
+        """Drop all objects from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get the statistics of the cache.
+
+        Returns:
+            dict: The hits, misses and evictions of the cache, and the name,
+            estimated bytes and hits of every entry from the least recently
+            used.
+        """
+        with self._lock:
+            entries = []
+            for key, entry in self._entries.items():
+                entry.size = estimate_size(entry.value)
+                entries.append(
+                    dict(
+                        key=key,
+                        name=entry.name,
+                        bytes=entry.size,
+                        hits=entry.hits,
+                        pinned=entry.pinned,
+                        last_used=entry.last_used,
+                    ))
+            return dict(
+                max_bytes=self.max_bytes,
+                total_bytes=self._total_size(),
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=entries,
+            )
+
+    def __contains__(self, obj) -> bool:
+        with self._lock:
+            return len(self._find(obj)) > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+OBJECT_CACHE = ObjectCache()
+
+
+def load_or_build_object(constructor: Callable, *args, **kwargs):
+    """Get the object built by the same arguments from the global cache, or
+    build and cache a new one."""
+    return OBJECT_CACHE.get_or_build(constructor, *args, **kwargs)
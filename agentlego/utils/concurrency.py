@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool used to run blocking calls in coroutines.
+
+    The maximum number of threads can be set by the ``AGENTLEGO_MAX_WORKERS``
+    environment variable. Defaults to 32.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                max_workers = int(os.getenv('AGENTLEGO_MAX_WORKERS', 32))
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix='agentlego')
+    return _EXECUTOR
+
+
+async def run_in_executor(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking function in the shared thread pool without blocking the
+    event loop.
+
+    Args:
+        func (Callable): The function to run.
+        *args: The positional arguments of the function.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        Any: The return value of the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(),
+                                      functools.partial(func, *args, **kwargs))
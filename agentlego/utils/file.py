@@ -28,6 +28,15 @@ def temp_path(category: str,
     return str(path.absolute())
 
 
+def get_cache_dir(category: str = '') -> Path:
+    """Get the directory to persist the caches of AgentLego, which is
+    ``~/.cache/agentlego`` by default and can be changed by the
+    ``AGENTLEGO_CACHE_DIR`` environment variable."""
+    root = os.getenv('AGENTLEGO_CACHE_DIR',
+                     os.path.join(os.getenv('XDG_CACHE_HOME', '~/.cache'), 'agentlego'))
+    return Path(root).expanduser() / category
+
+
 def _get_torchhub_dir():
     torch_home = os.path.expanduser(
         os.getenv('TORCH_HOME',
@@ -0,0 +1,63 @@
+import uuid
+from typing import Dict, List, Sequence, Tuple
+
+Part = Tuple[Dict[str, str], bytes]
+
+
+def encode_multipart(parts: Sequence[Part]) -> Tuple[bytes, str]:
+    """Encode the parts into a ``multipart/mixed`` body.
+
+    Args:
+        parts (Sequence[tuple[dict, bytes]]): The headers and the raw data of
+            every part.
+
+    Returns:
+        tuple[bytes, str]: The body and the content type with the boundary.
+    """
+    boundary = uuid.uuid4().hex
+    chunks = []
+    for headers, data in parts:
+        chunks.append(f'--{boundary}\r\n'.encode())
+        for k, v in headers.items():
+            chunks.append(f'{k}: {v}\r\n'.encode('latin-1'))
+        chunks.append(b'\r\n')
+        chunks.append(data)
+        chunks.append(b'\r\n')
+    chunks.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(chunks), f'multipart/mixed; boundary={boundary}'
+
+
+def decode_multipart(content: bytes, content_type: str) -> List[Part]:
+    """Decode a ``multipart/mixed`` body into parts.
+
+    Args:
+        content (bytes): The body.
+        content_type (str): The content type with the boundary.
+
+    Returns:
+        list[tuple[dict, bytes]]: The headers (with lower-case names) and the
+        raw data of every part.
+    """
+    boundary = None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'boundary':
+            boundary = value.strip('"')
+    if not boundary:
+        raise ValueError(f'No boundary in the content type `{content_type}`.')
+
+    parts = []
+    # Skip the preamble and the epilogue.
+    for segment in content.split(f'--{boundary}'.encode())[1:-1]:
+        segment = segment[2:-2]
+        if segment.startswith(b'\r\n'):
+            raw_headers, data = b'', segment[2:]
+        else:
+            raw_headers, _, data = segment.partition(b'\r\n\r\n')
+        headers = {}
+        for line in raw_headers.decode('latin-1').split('\r\n'):
+            if line:
+                key, _, value = line.partition(':')
+                headers[key.strip().lower()] = value.strip()
+        parts.append((headers, data))
+    return parts
@@ -450,6 +450,10 @@ class APIResponse(BaseModel):
     media_type: str = Field(alias='media_type')
     """The media type of the response."""
 
+    other_media_types: List[str] = Field(default=[], alias='other_media_types')
+    """The other available media types of the response, like the
+    ``multipart/mixed`` binary response of the AgentLego tool server."""
+
     @classmethod
     def _process_supported_media_type(
         cls,
@@ -515,6 +519,7 @@ class APIResponse(BaseModel):
             description=response.description,
             properties=properties,
             media_type=media_type,
+            other_media_types=[k for k in response.content if k != media_type],
         )
 
 
@@ -8,23 +8,24 @@ from .api_model import PRIMITIVE_TYPES, APIOperation, APIPropertyBase
 def prop_to_parameter(prop: APIPropertyBase) -> Parameter:
     from agentlego.types import AudioIO, File, ImageIO
     p_type = PRIMITIVE_TYPES.get(prop.type, prop.type)  # type: ignore
-    p = Parameter(
+    filetype = None
+    if p_type is str:
+        schema_format = prop.format or ''
+        if 'image' in schema_format:
+            p_type = ImageIO
+        elif 'audio' in schema_format:
+            p_type = AudioIO
+        elif 'binary' in schema_format or 'base64' in schema_format:
+            p_type = File
+            filetype, _, _ = schema_format.partition(';')
+    return Parameter(
         type=p_type,
         name=prop.name if prop.name != '_null' else None,
         description=prop.description,
         optional=not prop.required,
         default=prop.default,
+        filetype=filetype,
     )
-    if p_type is str:
-        schema_format = prop.format or ''
-        if 'image' in schema_format:
-            p.type = ImageIO
-        elif 'audio' in schema_format:
-            p.type = AudioIO
-        elif 'binary' in schema_format or 'base64' in schema_format:
-            p.type = File
-            p.filetype, _, _ = schema_format.partition(';')
-    return p
 
 
 def operation_inputs(op: APIOperation) -> Tuple[Parameter, ...]:
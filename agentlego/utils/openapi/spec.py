@@ -3,6 +3,7 @@
 from __future__ import annotations
 import json
 import re
+import threading
 import warnings
 from enum import Enum
 from pathlib import Path
@@ -18,6 +19,12 @@ if TYPE_CHECKING:
                                   Reference, RequestBody, Schema)
 
 
+# The specs fetched from URLs with their validators, like
+# {url: (etag, last_modified, spec)}
+_SPEC_CACHE: Dict[str, Tuple[Optional[str], Optional[str], 'OpenAPISpec']] = {}
+_SPEC_CACHE_LOCK = threading.Lock()
+
+
 class HTTPVerb(str, Enum):
     """Enumerator of the HTTP verbs."""
 
@@ -223,12 +230,47 @@ class OpenAPISpec(OpenAPI):
             return cls.from_text(f.read())
 
     @classmethod
-    def from_url(cls, url: str) -> OpenAPISpec:
-        """Get an OpenAPI spec from a URL."""
-        response = requests.get(url)
+    def from_url(cls,
+                 url: str,
+                 session: Optional[requests.Session] = None,
+                 use_cache: bool = True) -> OpenAPISpec:
+        """Get an OpenAPI spec from a URL.
+
+        The specs with an ``ETag`` or a ``Last-Modified`` header are cached in
+        the process, and the following calls only revalidate the cached spec by
+        a conditional request, which skips downloading and parsing if the spec
+        is not modified.
+
+        Args:
+            url (str): The URL of the spec.
+            session (requests.Session | None): The HTTP session to send the
+                request. Defaults to None.
+            use_cache (bool): Whether to use the cached spec. Defaults to True.
+        """
+        with _SPEC_CACHE_LOCK:
+            cached = _SPEC_CACHE.get(url) if use_cache else None
+
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag is not None:
+                headers['If-None-Match'] = etag
+            if last_modified is not None:
+                headers['If-Modified-Since'] = last_modified
+
+        response = (session or requests).get(url, headers=headers)
+        if cached is not None and response.status_code == 304:
+            return cached[2]
+
         spec = cls.from_text(response.text)
         if spec.base_url == '/':
             spec.servers[0].url = urljoin(url, '/')
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if use_cache and (etag is not None or last_modified is not None):
+            with _SPEC_CACHE_LOCK:
+                _SPEC_CACHE[url] = (etag, last_modified, spec)
         return spec
 
     @property
@@ -1,3 +1,5 @@
+import pytest
+
 from agentlego.apis.tool import list_tools, load_tool
 from agentlego.tools import Calculator
 
@@ -20,3 +22,103 @@ def test_load_tool():
 def test_list_tools():
 
     assert 'Calculator' in list_tools()
+
+
+def test_lazy_import():
+    import subprocess
+    import sys
+
+    code = ('import sys, agentlego; '
+            'assert "agentlego.tools.calculator" not in sys.modules; '
+            'agentlego.load_tool("Calculator"); '
+            'assert "agentlego.tools.calculator" in sys.modules; '
+            'assert "agentlego.tools.ocr" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_lazy_registry(tmp_path, monkeypatch):
+    import sys
+
+    import agentlego.tools
+    from agentlego.apis.tool import ToolRegistry
+
+    with pytest.raises(AttributeError):
+        agentlego.tools.NonexistentTool
+    assert 'OCR' in dir(agentlego.tools)
+    # The tool is cached in the module after the first access.
+    assert agentlego.tools.Calculator is vars(agentlego.tools)['Calculator']
+
+    (tmp_path / 'lazy_tools.py').write_text(
+        'from agentlego.tools import BaseTool\n\n\n'
+        'class LazyTool(BaseTool):\n'
+        "    default_desc = 'A lazy tool.'\n\n"
+        '    def apply(self, text: str) -> str:\n'
+        '        return text\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    registry = ToolRegistry()
+    registry.register_lazy('LazyTool', 'lazy_tools:LazyTool')
+    assert 'LazyTool' in registry and list(registry) == ['LazyTool']
+    assert registry.target('LazyTool') == 'lazy_tools:LazyTool'
+    assert 'lazy_tools' not in sys.modules
+
+    tool = registry['LazyTool']
+    assert 'lazy_tools' in sys.modules
+    assert tool.__name__ == 'LazyTool'
+    assert registry.target('LazyTool') == 'lazy_tools:LazyTool'
+    monkeypatch.delitem(sys.modules, 'lazy_tools')
+
+
+def test_tool_manifest(tmp_path):
+    from agentlego.apis.manifest import ToolManifest
+    from agentlego.apis.tool import NAMES2TOOLS
+
+    manifest = ToolManifest(NAMES2TOOLS, cache_dir=str(tmp_path))
+    toolmeta = manifest.get('Calculator')
+    assert toolmeta == Calculator.get_default_toolmeta()
+    assert manifest.path.exists()
+
+    # Load from the persisted manifest.
+    manifest = ToolManifest(NAMES2TOOLS, cache_dir=str(tmp_path))
+    assert manifest.get('Calculator') == toolmeta
+
+
+def test_tool_manifest_persisted(tmp_path, monkeypatch):
+    import json
+
+    from agentlego.apis import manifest as manifest_module
+    from agentlego.apis.manifest import ToolManifest
+    from agentlego.apis.tool import NAMES2TOOLS
+
+    manifest = ToolManifest(NAMES2TOOLS, cache_dir=str(tmp_path))
+    toolmeta = manifest.get('Calculator')
+    data = json.loads(manifest.path.read_text())
+    assert list(data['tools']) == ['Calculator']
+
+    # The persisted tool meta is used without inspecting the tool class.
+    data['tools']['Calculator']['toolmeta']['description'] = 'persisted'
+    manifest.path.write_text(json.dumps(data))
+    monkeypatch.setattr(Calculator, 'get_default_toolmeta', None)
+    manifest = ToolManifest(NAMES2TOOLS, cache_dir=str(tmp_path))
+    assert manifest.get('Calculator').description == 'persisted'
+    monkeypatch.undo()
+
+    # The manifest is invalid once the source files change.
+    monkeypatch.setattr(manifest_module, '_source_fingerprint', lambda: 'changed')
+    manifest = ToolManifest(NAMES2TOOLS, cache_dir=str(tmp_path))
+    assert manifest.get('Calculator') == toolmeta
+    data = json.loads(manifest.path.read_text())
+    assert data['fingerprint'] == 'changed'
+    assert data['tools']['Calculator']['toolmeta']['description'] != 'persisted'
+
+    # The manifest is not persisted if disabled.
+    manifest = ToolManifest(
+        NAMES2TOOLS, cache_dir=str(tmp_path / 'disabled'), persist=False)
+    assert manifest.get('Calculator') == toolmeta
+    assert not manifest.path.exists()
+
+
+def test_search_bm25():
+    from agentlego.search import search_tool
+
+    assert search_tool('calculate math expression', kind='bm25')[0] == 'Calculator'
+    assert search_tool('nonexistentword', kind='bm25') == []
@@ -0,0 +1,97 @@
+import numpy as np
+
+from agentlego.search import BM25Index, EmbeddingIndex, tokenize
+
+
+class CountEmbed:
+    """Embed the texts by the counts of the letters."""
+
+    def __init__(self, dim=26):
+        self.dim = dim
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        embeddings = np.full((len(texts), self.dim), 0.1, dtype=np.float32)
+        for i, text in enumerate(texts):
+            for char in text:
+                if char.isalpha():
+                    embeddings[i, (ord(char.lower()) - ord('a')) % self.dim] += 1
+        return embeddings
+
+
+def test_embedding_index(tmp_path):
+    choices = ['aaa', 'bbb', 'ccc']
+    embed = CountEmbed()
+    index = EmbeddingIndex('test/model', embed, cache_dir=str(tmp_path))
+    assert index.search('bb', choices, topk=2)[0] == 'bbb'
+    assert embed.texts == [*choices, 'bb']
+    assert index.path.exists()
+
+    # Load from the persisted index, and only the new text is embedded.
+    embed = CountEmbed()
+    index = EmbeddingIndex('test/model', embed, cache_dir=str(tmp_path))
+    assert index.search('cc', [*choices, 'ddd'], topk=1) == ['ccc']
+    assert embed.texts == ['ddd', 'cc']
+
+
+def test_embedding_index_rebuild(tmp_path):
+    choices = ['aaa', 'bbb']
+    index = EmbeddingIndex('model', CountEmbed(), cache_dir=str(tmp_path))
+    index.add(choices)
+
+    # The keys mismatch the rows of the embeddings.
+    with np.load(index.path) as data:
+        keys, embeddings = data['keys'], data['embeddings']
+    with open(index.path, 'wb') as f:
+        np.savez(f, keys=keys[:1], embeddings=embeddings)
+    embed = CountEmbed()
+    index = EmbeddingIndex('model', embed, cache_dir=str(tmp_path))
+    assert index.search('b', choices, topk=1) == ['bbb']
+    assert embed.texts == [*choices, 'b']
+
+    # The broken file.
+    index.path.write_bytes(b'broken')
+    embed = CountEmbed()
+    index = EmbeddingIndex('model', embed, cache_dir=str(tmp_path))
+    assert index.search('a', choices, topk=1) == ['aaa']
+    assert embed.texts == [*choices, 'a']
+
+    # The stale index built by another model with the same name.
+    embed = CountEmbed(dim=8)
+    index = EmbeddingIndex('model', embed, cache_dir=str(tmp_path))
+    assert index.search('b', [*choices, 'ccc'], topk=1) == ['bbb']
+    assert embed.texts == ['ccc', *choices, 'ccc', 'b']
+    with np.load(index.path) as data:
+        assert data['embeddings'].shape == (3, 8)
+        assert len(data['keys']) == 3
+
+
+def test_tokenize():
+    assert tokenize('ImageToCanny detects the OCRText') == [
+        'image', 'canny', 'detects', 'ocr', 'text'
+    ]
+
+
+def test_bm25_index():
+    index = BM25Index()
+    index.add('canny', 'Detect the canny edges of an image')
+    index.add('depth', 'Estimate the depth of an image')
+    index.add('speech', 'Convert the speech audio to text')
+    index.add('ocr', 'Recognize the text in an image, text text')
+    assert len(index) == 4 and 'ocr' in index
+
+    # The rare terms weigh more than the common terms.
+    assert index.search('image depth', topk=4) == ['depth', 'canny', 'ocr']
+    # The frequent terms weigh more, and the stop words are ignored.
+    assert index.search('the text', topk=1) == ['ocr']
+    assert index.search('the', topk=4) == []
+    assert index.search('depth image canny edges', topk=1) == ['canny']
+
+    # Update and remove documents.
+    index.add('speech', 'Convert the speech audio to a depth map')
+    assert index.search('text') == ['ocr']
+    assert set(index.search('depth')) == {'depth', 'speech'}
+    index.remove('depth')
+    assert index.search('depth estimate') == ['speech']
+    assert 'estimate' not in index._postings
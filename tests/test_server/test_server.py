@@ -0,0 +1,169 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agentlego.parsers import NaiveParser
+from agentlego.server.batching import BatchScheduler
+from agentlego.server.pool import ToolWorkerPool
+from agentlego.server.server import add_tool
+from agentlego.tools import BaseTool
+
+
+class EchoTool(BaseTool):
+    default_desc = 'Echo the text.'
+
+    def __init__(self):
+        super().__init__(parser=NaiveParser)
+        self.batch_sizes = []
+        self.started = threading.Event()
+        self.resume = threading.Event()
+        self.resume.set()
+
+    def apply(self, text: str) -> str:
+        self.started.set()
+        self.resume.wait(5)
+        if text == 'bad':
+            raise ValueError('bad input')
+        return text.upper()
+
+    def apply_batch(self, batch_inputs):
+        self.batch_sizes.append(len(batch_inputs))
+        if any(kwargs['text'] == 'bad' for kwargs in batch_inputs):
+            raise ValueError('bad batch')
+        return [kwargs['text'].upper() for kwargs in batch_inputs]
+
+
+def create_client(tool, batch_size=1, **pool_kwargs):
+    app = FastAPI()
+    pool = ToolWorkerPool(tool.name, **pool_kwargs)
+    batcher = BatchScheduler(
+        tool, max_batch_size=batch_size, max_batch_delay=0.5,
+        pool=pool) if batch_size > 1 else None
+    add_tool(tool, app, pool=pool, batcher=batcher)
+    return TestClient(app)
+
+
+def post_all(client, texts):
+    with ThreadPoolExecutor(len(texts)) as executor:
+        return list(
+            executor.map(lambda text: client.post('/EchoTool', data={'text': text}),
+                         texts))
+
+
+def test_batching():
+    tool = EchoTool()
+    with create_client(tool, batch_size=2) as client:
+        responses = post_all(client, ['a', 'b', 'c', 'd', 'e'])
+    assert [r.json() for r in responses] == ['A', 'B', 'C', 'D', 'E']
+    assert sum(tool.batch_sizes) == 5
+    assert max(tool.batch_sizes) == 2
+
+
+def test_batching_fallback():
+    tool = EchoTool()
+    with create_client(tool, batch_size=4) as client:
+        responses = post_all(client, ['a', 'bad', 'c'])
+    # Only the failed call gets the error after calling one by one.
+    assert [r.status_code for r in responses] == [200, 400, 200]
+    assert responses[0].json() == 'A' and responses[2].json() == 'C'
+    assert 'bad input' in responses[1].json()['detail']
+
+
+def test_backpressure():
+    tool = EchoTool()
+    tool.resume.clear()
+    with create_client(tool, max_concurrency=1, max_queue=0) as client:
+        with ThreadPoolExecutor(1) as executor:
+            first = executor.submit(client.post, '/EchoTool', data={'text': 'a'})
+            assert tool.started.wait(5)
+            # Both the worker and the queue are full.
+            response = client.post('/EchoTool', data={'text': 'b'})
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '1'
+            tool.resume.set()
+            assert first.result().json() == 'A'
+
+
+def test_queue_timeout():
+    tool = EchoTool()
+    tool.resume.clear()
+    with create_client(
+            tool, max_concurrency=1, queue_timeout=0.1, retry_after=3) as client:
+        with ThreadPoolExecutor(1) as executor:
+            first = executor.submit(client.post, '/EchoTool', data={'text': 'a'})
+            assert tool.started.wait(5)
+            response = client.post('/EchoTool', data={'text': 'b'})
+            assert response.status_code == 503
+            assert response.headers['Retry-After'] == '3'
+            tool.resume.set()
+            assert first.result().json() == 'A'
+
+
+TOOL_OPTIONS = dict(
+    max_concurrency=1,
+    max_queue=1,
+    queue_timeout=None,
+    max_batch_size=1,
+    max_batch_delay_ms=10,
+    idle_unload=None)
+
+
+def create_extra_app(tmp_path, setup=False, preload=False):
+    from agentlego.server.server import create_app
+
+    # The tool records the threads to setup it.
+    extra = tmp_path / 'echo_tool.py'
+    extra.write_text('import threading\n\n'
+                     'from agentlego.tools import BaseTool\n\n\n'
+                     'class Echo(BaseTool):\n'
+                     "    default_desc = 'Echo the text.'\n\n"
+                     '    def setup(self):\n'
+                     f'        with open({str(tmp_path / "setup.txt")!r}, "a") as f:\n'
+                     '            f.write(threading.current_thread().name + "\\n")\n\n'
+                     '    def apply(self, text: str) -> str:\n'
+                     '        return text\n')
+    return create_app(['Echo'], {'Echo': TOOL_OPTIONS},
+                      device='cpu',
+                      setup=setup,
+                      extra=[extra],
+                      title='AgentLego',
+                      server_url='http://127.0.0.1:16180',
+                      preload=preload)
+
+
+def test_setup(tmp_path):
+    setup_file = tmp_path / 'setup.txt'
+    create_extra_app(tmp_path)
+    assert not setup_file.exists()
+
+    # Setup the tools one by one in the main thread by default.
+    create_extra_app(tmp_path, setup=True)
+    assert setup_file.read_text().split() == [threading.current_thread().name]
+
+    create_extra_app(tmp_path, setup=True, preload=True)
+    assert setup_file.read_text().split()[1] == 'agentlego-preload-Echo'
+
+
+def test_openapi_etag(tmp_path):
+    app = create_extra_app(tmp_path)
+
+    with TestClient(app) as client:
+        response = client.get('/openapi.json')
+        assert response.status_code == 200
+        assert '/Echo' in response.json()['paths']
+        etag = response.headers['ETag']
+
+        response = client.get('/openapi.json', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.content == b''
+
+        # Any of the listed tags matches, and a stale tag gets the full spec.
+        response = client.get(
+            '/openapi.json', headers={'If-None-Match': f'"stale", {etag}'})
+        assert response.status_code == 304
+        response = client.get('/openapi.json', headers={'If-None-Match': '"stale"'})
+        assert response.status_code == 200
+        assert response.headers['ETag'] == etag
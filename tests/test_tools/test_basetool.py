@@ -51,3 +51,127 @@ Returns: path (The result image)'''
 
     assert tool.name == 'DummyTool'
     assert tool.description == expected_description
+
+
+class BatchTool(BaseTool):
+    default_desc = 'This is a batch tool.'
+
+    def apply(self, a: int, b: int = 1) -> int:
+        return a * b
+
+    def apply_batch(self, batch_inputs):
+        self.batch_sizes.append(len(batch_inputs))
+        return super().apply_batch(batch_inputs)
+
+
+def test_batch():
+    tool = BatchTool()
+    tool.batch_sizes = []
+    results = tool.batch([dict(a=2, b=3), (4, 5), 6, dict(a='7')])
+    assert results == [6, 20, 6, 7]
+    assert tool.batch_sizes == [4]
+
+
+class AsyncTool(BaseTool):
+    default_desc = 'This is an async tool.'
+
+    def apply(self, a: int, b: int = 1) -> int:
+        return a * b
+
+    async def aapply(self, a: int, b: int = 1) -> int:
+        return -a * b
+
+
+def test_acall():
+    import asyncio
+
+    async def main():
+        return await asyncio.gather(BatchTool().acall(2, b=3), AsyncTool().acall('2', 3))
+
+    assert asyncio.run(main()) == [6, -6]
+
+
+class HeavyTool(BaseTool):
+    default_desc = 'This is a tool with a model.'
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+
+    def setup(self):
+        self.model = object()
+        self.extra = 'loaded'
+
+    def apply(self, a: int) -> bool:
+        return self.model is not None
+
+
+def test_teardown():
+    from agentlego.utils import OBJECT_CACHE, load_or_build_object
+
+    class CachedTool(HeavyTool):
+
+        def setup(self):
+            self.model = load_or_build_object(dict, tool='CachedTool')
+
+    def cached_keys():
+        return {entry['key'] for entry in OBJECT_CACHE.stats()['entries']}
+
+    tool = CachedTool()
+    assert tool(1)
+    model_keys = set(OBJECT_CACHE.keys_of([tool.model]))
+    # The unused objects of others are not dropped by the teardown.
+    unused_keys = set(OBJECT_CACHE.keys_of([load_or_build_object(dict, tool='unused')]))
+
+    tool.teardown()
+    assert not tool._is_setup
+    assert tool.model is None
+    assert model_keys and model_keys.isdisjoint(cached_keys())
+    assert unused_keys and unused_keys <= cached_keys()
+    OBJECT_CACHE.release_unused()
+    assert unused_keys.isdisjoint(cached_keys())
+
+    assert tool(1)
+    assert tool.model is not None and model_keys <= cached_keys()
+
+    tool = HeavyTool()
+    tool(1)
+    tool.teardown()
+    assert not hasattr(tool, 'extra')
+
+
+def test_idle_unload():
+    import time
+
+    from agentlego.tools.base import _IDLE_REAPER
+
+    tool = HeavyTool()
+    assert tool(1)
+    # Setting after setup also watches the tool.
+    tool.idle_unload_seconds = 0
+    assert tool in _IDLE_REAPER._tools
+    deadline = time.time() + 5
+    while tool._is_setup and time.time() < deadline:
+        time.sleep(0.1)
+    assert not tool._is_setup
+
+
+def test_preload():
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowTool(HeavyTool):
+        num_setup = 0
+
+        def setup(self):
+            import time
+            time.sleep(0.1)
+            type(self).num_setup += 1
+            super().setup()
+
+    # Concurrent calls during the preload share the only setup.
+    tool = SlowTool()
+    future = tool.preload()
+    with ThreadPoolExecutor(4) as executor:
+        assert all(executor.map(tool, range(8)))
+    assert future.result() is tool
+    assert SlowTool.num_setup == 1
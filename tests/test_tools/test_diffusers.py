@@ -0,0 +1,108 @@
+import gc
+import sys
+import types
+import weakref
+
+import pytest
+
+from agentlego.tools import BaseTool
+from agentlego.tools.utils.diffusers import DiffusionEngine
+
+
+class FakePipeline:
+
+    def __init__(self, controlnet=None, **components):
+        self.controlnet = controlnet
+        self.components = components
+
+    @classmethod
+    def from_pretrained(cls, model, **kwargs):
+        return cls(unet=FakeModel(model))
+
+    def to(self, device):
+        return self
+
+    def __call__(self, prompt, **kwargs):
+        return (prompt, self.controlnet.name if self.controlnet else None)
+
+
+class FakeModel:
+
+    def __init__(self, name):
+        self.name = name
+
+    @classmethod
+    def from_pretrained(cls, name, **kwargs):
+        return cls(name)
+
+    def to(self, device):
+        return self
+
+
+@pytest.fixture
+def fake_diffusers(monkeypatch):
+    """Replace torch and diffusers to run the engine without the weights."""
+    torch = types.ModuleType('torch')
+    torch.float16, torch.float32 = 'float16', 'float32'
+    torch.cuda = types.SimpleNamespace(is_initialized=lambda: False)
+    diffusers = types.ModuleType('diffusers')
+    for name in ('StableDiffusionPipeline', 'StableDiffusionControlNetPipeline',
+                 'StableDiffusionXLPipeline', 'StableDiffusionXLControlNetPipeline'):
+        setattr(diffusers, name, type(name, (FakePipeline, ), {}))
+    diffusers.AutoencoderKL = diffusers.ControlNetModel = FakeModel
+    monkeypatch.setitem(sys.modules, 'torch', torch)
+    monkeypatch.setitem(sys.modules, 'diffusers', diffusers)
+
+
+def test_engine_pipelines(fake_diffusers):
+    engine = DiffusionEngine('sd', 'base', device='cpu')
+    assert engine.pipeline() is engine.t2i
+    assert engine('a cat') == ('a cat', None)
+
+    pipe = engine.pipeline('canny')
+    # The ControlNet pipelines share the base modules and the same ControlNet.
+    assert pipe.components['unet'] is engine.t2i.components['unet']
+    assert engine.pipeline('canny') is pipe
+    assert engine.pipeline('depth') is not pipe
+    assert engine('a cat', controlnet='canny') == ('a cat', 'canny')
+
+    # The ControlNet is released once no one holds the pipeline.
+    controlnet = weakref.ref(pipe.controlnet)
+    del pipe
+    gc.collect()
+    assert controlnet() is None
+    assert list(engine._pipelines) == []
+
+
+def test_controlnet_teardown(fake_diffusers):
+    from agentlego.tools.image_canny.canny_to_image import CannyTextToImage
+    from agentlego.tools.image_depth.depth_to_image import DepthTextToImage
+
+    tools = []
+    for tool_type in (CannyTextToImage, DepthTextToImage, CannyTextToImage):
+        # Skip the dependency check of diffusers.
+        tool = tool_type.__new__(tool_type)
+        BaseTool.__init__(tool)
+        tool.model, tool.device = 'sd', 'cpu'
+        tool._setup_once()
+        tools.append(tool)
+
+    canny, depth, canny2 = tools
+    # All tools share one engine, and the same ControlNet.
+    assert canny.engine is depth.engine is canny2.engine
+    assert canny.pipe is canny2.pipe and canny.pipe is not depth.pipe
+    engine = weakref.ref(canny.engine)
+    canny_net = weakref.ref(canny.pipe.controlnet)
+    depth_net = weakref.ref(depth.pipe.controlnet)
+
+    depth.teardown()
+    canny.teardown()
+    gc.collect()
+    assert depth_net() is None
+    assert canny_net() is not None and engine() is not None
+
+    # Release the engine with the last tool.
+    canny2.teardown()
+    del tools, canny, depth, canny2, tool
+    gc.collect()
+    assert canny_net() is None and engine() is None
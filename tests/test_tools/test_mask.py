@@ -0,0 +1,32 @@
+import sys
+
+import numpy as np
+import pytest
+
+from agentlego.tools.utils.mask import dilate_mask
+
+
+def dilate_mask_loop(mask, padding):
+    # The per-pixel loop used by `pad_edge` of the image editing tools.
+    mask_array = np.zeros_like(mask, dtype=bool)
+    for idx in np.argwhere(mask):
+        padded_slice = tuple(slice(max(0, i - padding), i + padding + 1) for i in idx)
+        mask_array[padded_slice] = True
+    return mask_array
+
+
+@pytest.mark.parametrize('padding', [0, 1, 3, 10])
+def test_dilate_mask(monkeypatch, padding):
+    # Use the numpy implementation even if OpenCV is installed.
+    monkeypatch.setitem(sys.modules, 'cv2', None)
+
+    rng = np.random.default_rng(0)
+    masks = [rng.random((23, 17)) > 0.97 for _ in range(20)]
+    border = np.zeros((12, 9), dtype=bool)
+    border[0, 0] = border[-1, 4] = border[5, -1] = True
+    masks += [border, np.zeros((5, 5), dtype=bool), np.ones((4, 6), dtype=bool)]
+
+    for mask in masks:
+        result = dilate_mask(mask, padding)
+        assert result.dtype == bool
+        np.testing.assert_array_equal(result, dilate_mask_loop(mask, padding))
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from agentlego.types import ImageIO
+
+
+@pytest.fixture
+def blob_server():
+    """Serve a tool with a small upload cache in a background thread."""
+    import uvicorn
+    from fastapi import FastAPI, Request
+
+    from agentlego.parsers import NaiveParser
+    from agentlego.server.router import find_free_port
+    from agentlego.server.server import add_tool
+    from agentlego.tools import BaseTool
+    from agentlego.utils.blobs import BlobStore
+
+    class ImageSize(BaseTool):
+        default_desc = 'Get the size of the image.'
+
+        def apply(self, image: ImageIO) -> str:
+            return 'x'.join(map(str, image.to_pil().size))
+
+    port = find_free_port()
+    app = FastAPI(servers=[{'url': f'http://127.0.0.1:{port}'}])
+    statuses = []
+
+    @app.middleware('http')
+    async def record_status(request: Request, call_next):
+        response = await call_next(request)
+        if request.url.path == '/ImageSize':
+            statuses.append(response.status_code)
+        return response
+
+    tool = ImageSize(parser=NaiveParser)
+    blobs = BlobStore(max_bytes=64 * 1024)
+    add_tool(tool, app, blobs=blobs)
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        assert thread.is_alive()
+        threading.Event().wait(0.05)
+    yield f'http://127.0.0.1:{port}', blobs, statuses
+    server.should_exit = True
+    thread.join()
+
+
+def test_remote_blob_reupload(blob_server):
+    from agentlego.tools.remote import RemoteTool
+
+    url, blobs, statuses = blob_server
+    tool = RemoteTool.from_url(f'{url}/ImageSize')
+    image = Image.fromarray(np.random.randint(0, 256, (20, 30, 3), dtype=np.uint8))
+
+    assert tool(ImageIO(image)) == '30x20'
+    assert len(blobs) == 1
+    # The second call refers to the uploaded blob by digest.
+    assert tool(ImageIO(image)) == '30x20'
+    assert statuses == [200, 200]
+
+    # Evict the blob by other uploads, and the referred call is rejected by
+    # 409 first, then uploads the content again.
+    blobs.put(b'x' * 63 * 1024)
+    assert len(blobs) == 1
+    assert tool(ImageIO(image)) == '30x20'
+    assert statuses == [200, 200, 409, 200]
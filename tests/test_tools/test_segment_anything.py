@@ -0,0 +1,158 @@
+import gc
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from agentlego.tools.segmentation.segment_anything import (SAM_EMBEDDING_CACHE,
+                                                           SamEmbeddingCache)
+
+
+def test_sam_embedding_cache():
+    cache = SamEmbeddingCache(max_items=2)
+    image = np.zeros((4, 6, 3), dtype=np.uint8)
+    key = cache.make_key('sam_a', image, 'RGB')
+    assert cache.make_key('sam_a', image.copy(), 'RGB') == key
+    # Non-contiguous views with the same content get the same key.
+    assert cache.make_key('sam_a', np.zeros((4, 12, 3), np.uint8)[:, ::2], 'RGB') == key
+    assert cache.make_key('sam_b', image, 'RGB') != key
+    assert cache.make_key('sam_a', image, 'BGR') != key
+    assert cache.make_key('sam_a', np.ones_like(image), 'RGB') != key
+
+    assert cache.get(key) is None
+    features = dict(features='a')
+    cache.put(key, features)
+    assert cache.get(key) is features
+
+    key_b = cache.make_key('sam_b', image, 'RGB')
+    cache.put(key_b, dict(features='b'))
+    # `key` is used recently, and the least recently used one is dropped.
+    assert cache.get(key) is features
+    cache.put(cache.make_key('sam_a', np.ones_like(image), 'RGB'), {})
+    assert cache.get(key_b) is None and cache.get(key) is features
+
+    # Only drop the embeddings of the model.
+    cache.put(key_b, dict(features='b'))
+    cache.clear('sam_a')
+    assert len(cache) == 1 and cache.get(key_b) is not None
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_sam_embedding_cache_register():
+    cache = SamEmbeddingCache()
+
+    class Predictor:
+        pass
+
+    image = np.zeros((4, 6, 3), dtype=np.uint8)
+    predictors = [Predictor(), Predictor(), Predictor()]
+    cache.register(predictors[0], 'sam_a')
+    cache.register(predictors[1], 'sam_a')
+    cache.register(predictors[2], 'sam_b')
+    cache.put(cache.make_key('sam_a', image, 'RGB'), {})
+    cache.put(cache.make_key('sam_b', image, 'RGB'), {})
+    predictors.pop()
+    gc.collect()
+    assert len(cache) == 1
+
+    # Drop the embeddings after all predictors of the model are released.
+    predictors.pop()
+    gc.collect()
+    assert len(cache) == 1
+    predictors.pop()
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_sam_predictor_cache(monkeypatch):
+    torch = pytest.importorskip('torch')
+    pytest.importorskip('segment_anything')
+    from agentlego.tools.segmentation.segment_anything import SamPredictor
+
+    class ImageEncoder(torch.nn.Module):
+        img_size = 16
+
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def forward(self, x):
+            self.calls += 1
+            return x.float().mean(dim=1, keepdim=True)
+
+    class FakeSam(torch.nn.Module):
+        image_format = 'RGB'
+
+        def __init__(self):
+            super().__init__()
+            self.image_encoder = ImageEncoder()
+            self.weight = torch.nn.Parameter(torch.zeros(1))
+
+        @property
+        def device(self):
+            return self.weight.device
+
+        def preprocess(self, x):
+            return x
+
+    monkeypatch.setattr(SAM_EMBEDDING_CACHE, '_items', OrderedDict())
+    sam = FakeSam()
+    predictor = SamPredictor(sam, model_id='fake')
+    image = np.random.randint(0, 256, (8, 12, 3), dtype=np.uint8)
+
+    features = predictor.set_image(image)
+    assert sam.image_encoder.calls == 1
+    # Hit by the same content from any predictor of the model.
+    assert predictor.set_image(image.copy()) is features
+    other = SamPredictor(sam, model_id='fake')
+    assert other.set_image(image) is features
+    assert sam.image_encoder.calls == 1
+    # Miss by another image or another color format.
+    predictor.set_image(np.ascontiguousarray(image[::-1]))
+    predictor.set_image(image, image_format='BGR')
+    assert sam.image_encoder.calls == 3
+
+    # The embeddings are dropped with the last predictor of the model.
+    del predictor
+    gc.collect()
+    assert len(SAM_EMBEDDING_CACHE) == 3
+    del other
+    gc.collect()
+    assert len(SAM_EMBEDDING_CACHE) == 0
+
+
+def test_show_annos():
+    from agentlego.tools.segmentation.segment_anything import SegmentAnything
+
+    masks = np.zeros((3, 8, 10), dtype=bool)
+    masks[0, 1:5, 1:6] = True
+    masks[1, 3:7, 4:9] = True
+    masks[2, 0:2, 8:10] = True
+    anns = [dict(segmentation=m) for m in masks]
+    # The bboxes in XYWH format only limit the region to write.
+    anns_bbox = [dict(segmentation=m, bbox=bbox)
+                 for m, bbox in zip(masks, [(1, 1, 4, 3), (4, 3, 4, 3), (8, 0, 1, 1)])]
+
+    # `show_annos` doesn't use the tool state.
+    np.random.seed(0)
+    full_img, label_map = SegmentAnything.show_annos(None, anns)
+    np.random.seed(0)
+    full_img_bbox, label_map_bbox = SegmentAnything.show_annos(None, anns_bbox)
+
+    expected = np.zeros((8, 10), dtype=np.uint16)
+    for i, m in enumerate(masks):
+        expected[m] = i + 1
+    assert label_map.dtype == np.uint16
+    np.testing.assert_array_equal(label_map, expected)
+    np.testing.assert_array_equal(label_map_bbox, expected)
+
+    # Every mask has a single color, and the background is black.
+    img = np.asarray(full_img)
+    assert full_img.size == (10, 8) and img.dtype == np.uint8
+    np.testing.assert_array_equal(img, np.asarray(full_img_bbox))
+    assert (img[expected == 0] == 0).all()
+    for i in range(1, 4):
+        assert len(np.unique(img[expected == i], axis=0)) == 1
+
+    assert SegmentAnything.show_annos(None, []) is None
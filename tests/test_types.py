@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from agentlego.types import File, ImageIO
+
+
+class SubArray(np.ndarray):
+    pass
+
+
+def test_dispatch():
+    array = np.zeros((4, 6, 3), dtype=np.uint8)
+    assert ImageIO(array).type == 'array'
+    assert ImageIO(Image.fromarray(array)).type == 'pil'
+    # The subclasses of the support types are matched.
+    assert ImageIO(array.view(SubArray)).type == 'array'
+
+    # The value types are resolved once, and every IOType has its own table.
+    assert ImageIO._dispatch[np.ndarray] == 'array'
+    assert ImageIO._dispatch[SubArray] == 'array'
+    assert np.ndarray not in File._dispatch
+    assert File(b'data').type == 'bytes'
+
+    with pytest.raises(NotImplementedError):
+        ImageIO(b'data')
+    assert ImageIO._dispatch[bytes] is None
+    with pytest.raises(NotImplementedError):
+        ImageIO(b'data')
+
+
+def test_conversion_cache(monkeypatch):
+    image = ImageIO(np.zeros((4, 6, 3), dtype=np.uint8))
+    assert image.to_array() is image.value
+
+    pil = image.to_pil()
+    assert pil.size == (6, 4)
+    assert image.to_pil() is pil
+
+    # Drop the cached conversions.
+    image.clear_cache()
+    assert image._cache == {}
+    assert image.to_pil() is not pil
+
+    monkeypatch.setattr(ImageIO, 'enable_cache', False)
+    image = ImageIO(np.zeros((4, 6, 3), dtype=np.uint8))
+    assert image.to_pil() is not image.to_pil()
+    assert image._cache == {}
@@ -0,0 +1,32 @@
+from agentlego.utils.blobs import BlobIndex, BlobStore, blob_digest
+
+
+def test_blob_store():
+    store = BlobStore(max_bytes=10)
+    a = store.put(b'aaaa')
+    b = store.put(b'bbbb')
+    assert a == blob_digest(b'aaaa')
+    assert store.get(a) == b'aaaa'
+
+    # `b` is the least recently used one after getting `a`.
+    c = store.put(b'cccc')
+    assert a in store and b not in store and c in store
+    assert store.get(b) is None
+    assert store.total_bytes == 8
+
+    # Putting the same content again only refreshes it.
+    assert store.put(b'aaaa') == a
+    assert store.total_bytes == 8 and len(store) == 2
+
+    # The content larger than the limit is never stored.
+    assert store.put(b'x' * 11) is None
+    assert len(store) == 2
+
+
+def test_blob_index():
+    index = BlobIndex(capacity=2)
+    index.add(['a', 'b'])
+    index.add(['c'])
+    assert 'a' not in index and 'b' in index and 'c' in index
+    index.discard(['b'])
+    assert 'b' not in index
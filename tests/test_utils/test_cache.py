@@ -0,0 +1,129 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agentlego.utils.cache import ObjectCache, estimate_size, make_key
+
+
+def build(*args, **kwargs):
+    return dict(args=args, kwargs=kwargs)
+
+
+def build_array(nbytes: int, tag: str = ''):
+    return np.zeros(nbytes, dtype=np.uint8)
+
+
+def test_make_key():
+    key, _ = make_key(build, cfg=dict(a=1, b=[1, 2]), path=Path('/tmp/model'))
+    # The dict order, list or tuple and path or str make no difference.
+    assert make_key(build, path='/tmp/model', cfg=dict(b=(1, 2), a=1))[0] == key
+    assert make_key(build, dict(b=(1, 2), a=1))[0] != key
+    assert make_key(build, cfg=dict(a=1, b=[1, 3]), path='/tmp/model')[0] != key
+    assert make_key(build_array, cfg=dict(a=1, b=[1, 2]), path='/tmp/model')[0] != key
+
+    cache = ObjectCache()
+    obj = cache.get_or_build(build, cfg=dict(a=1, b=[1, 2]), path=Path('/tmp/model'))
+    assert cache.get_or_build(build, path='/tmp/model', cfg={'b': (1, 2), 'a': 1}) is obj
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_estimate_size():
+    obj = dict(a=np.zeros(100, dtype=np.uint8), b=[np.zeros(10, dtype=np.float32)])
+    assert estimate_size(obj) == 140
+    # The shared array is only counted once.
+    assert estimate_size([obj['a'], obj['a']]) == 100
+
+
+def test_evict():
+    cache = ObjectCache(max_bytes=250)
+    a = cache.get_or_build(build_array, 100, 'a')
+    cache.get_or_build(build_array, 100, 'b')
+    cache.pin(a)
+    # Use `b` recently, but `a` is pinned, so `b` is the only candidate.
+    cache.get_or_build(build_array, 100, 'b')
+    c = cache.get_or_build(build_array, 100, 'c')
+    assert a in cache and c in cache and len(cache) == 2
+    assert cache.evictions == 1
+
+    cache.unpin(a)
+    del a
+    cache.get_or_build(build_array, 100, 'd')
+    # `a` is the least recently used one after unpinned.
+    assert c in cache and len(cache) == 2
+    assert cache.stats()['total_bytes'] == 200
+
+
+def test_evict_used():
+    cache = ObjectCache(max_bytes=150)
+    a = cache.get_or_build(build_array, 100, 'a')
+    b = cache.get_or_build(build_array, 100, 'b')
+    # `a` is still used outside the cache, and dropping it frees nothing.
+    assert a in cache and b in cache and cache.evictions == 0
+
+    del a
+    cache.get_or_build(build_array, 10, 'c')
+    assert b in cache and len(cache) == 2 and cache.evictions == 1
+
+
+class Tool:
+
+    def __init__(self, model):
+        self.model = model
+
+
+def test_evict_shared():
+    cache = ObjectCache(max_bytes=12000)
+    model = cache.get_or_build(build_array, 8000)
+    tool = cache.get_or_build(Tool, model)
+    del model
+    # The model used by the tool is only counted once.
+    assert cache.stats()['total_bytes'] == 8000
+    assert cache.get_or_build(build_array, 8000) is tool.model
+    assert len(cache) == 2 and cache.evictions == 0
+
+    # The model held by the cached tool is never evicted.
+    cache.get_or_build(build_array, 5000)
+    assert cache.get_or_build(build_array, 8000) is tool.model
+
+
+def test_build_error():
+    cache = ObjectCache()
+
+    def build_error():
+        raise RuntimeError('build error')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build(build_error)
+    assert cache._build_locks == {} and len(cache) == 0
+
+
+def test_release_unused():
+    cache = ObjectCache()
+    used = cache.get_or_build(build_array, 10, 'used')
+    cache.get_or_build(build_array, 10, 'unused')
+    pinned = cache.get_or_build(build_array, 10, 'pinned')
+    cache.pin(pinned)
+    del pinned
+
+    assert cache.release_unused() == 1
+    assert used in cache and len(cache) == 2
+
+    assert cache.release(used)
+    assert not cache.release(used)
+    assert len(cache) == 1
+
+
+def test_release_unused_keys():
+    cache = ObjectCache()
+    other = cache.get_or_build(build_array, 10, 'other')
+    model = cache.get_or_build(build_array, 10, 'model')
+    # The predictor keeps the model as its argument.
+    predictor = cache.get_or_build(build, model)
+    keys = cache.keys_of([predictor])
+    del other, model, predictor
+
+    # Only the predictor and the objects used by it are dropped.
+    assert cache.release_unused(keys) == 2
+    assert len(cache) == 1
+    assert cache.release_unused() == 1
@@ -0,0 +1,45 @@
+import json
+import wave
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from agentlego.utils.multipart import decode_multipart, encode_multipart
+
+
+def test_multipart_round_trip():
+    file = BytesIO()
+    Image.fromarray(np.random.randint(0, 256, (16, 16, 3), dtype=np.uint8)).save(
+        file, format='png')
+    image = file.getvalue()
+
+    file = BytesIO()
+    with wave.open(file, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(np.random.randint(-2**15, 2**15, 1600, dtype=np.int16).tobytes())
+    audio = file.getvalue()
+
+    parts = [
+        ({'Content-Type': 'image/png'}, image),
+        ({'Content-Type': 'audio/wav'}, audio),
+        ({'Content-Type': 'application/json'}, json.dumps('a text').encode()),
+        # The raw data may look like the line breaks and the delimiters.
+        ({'Content-Type': 'application/octet-stream'}, b'\r\n--\r\n\r\ndata\r\n'),
+        ({}, b''),
+    ]
+    content, content_type = encode_multipart(parts)
+    assert content_type.startswith('multipart/mixed; boundary=')
+
+    decoded = decode_multipart(content, content_type)
+    assert len(decoded) == len(parts)
+    for (headers, data), (decoded_headers, decoded_data) in zip(parts, decoded):
+        assert decoded_headers == {k.lower(): v for k, v in headers.items()}
+        assert decoded_data == data
+
+    assert Image.open(BytesIO(decoded[0][1])).size == (16, 16)
+    with wave.open(BytesIO(decoded[1][1])) as f:
+        assert f.getnframes() == 1600
+    assert json.loads(decoded[2][1]) == 'a text'
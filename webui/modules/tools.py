@@ -29,8 +29,7 @@ def load_tool(name=None):
 
     try:
         tool = load_tool_from_cfg(cfg)
-        tool.setup()
-        tool._is_setup = True
+        tool.preload().result()
         shared.toolkits[name] = tool
         return tool
     except Exception as e:
@@ -59,8 +58,8 @@ def load_tool_from_cfg(tool_cfg):
     else:
         tool = tool_class(**kwargs)
 
-    tool.toolmeta.name = tool_cfg['name']
-    tool.toolmeta.description = tool_cfg['description']
+    tool.name = tool_cfg['name']
+    tool.description = tool_cfg['description']
 
     return tool
 
@@ -91,8 +91,7 @@ def setup_tools(*args):
         tool = shared.toolkits[name]
         if not tool._is_setup:
             yield f'Setup `{name}`...'
-            tool.setup()
-            tool._is_setup = True
+            tool.preload().result()
     yield 'Done'
 
 